@@ -0,0 +1,43 @@
+ROWS, COLS = 6, 7
+
+PIECE_COLOURS = {0: "#f2f2f2", +1: "#f1c40f", -1: "#e74c3c"}
+BORDER = "2px solid #333"
+HIGHLIGHT_BORDER = "5px solid #00ff00"
+
+class BoardRenderer:
+  """
+  Draws a board onto the 6x7 grid of Labels, remembering what each cell
+  currently shows. Only cells whose piece or highlight changed get their
+  properties set, since every property write crosses the Skulpt/JS bridge
+  and touches the DOM: a normal drop updates one label instead of 84
+  properties.
+  """
+
+  def __init__(self, grid):
+    self.grid = grid
+    # (piece, highlighted) last written to each label; None = never drawn
+    self._shown = [[None] * COLS for _ in range(ROWS)]
+
+  def render(self, board, highlight_cells=None):
+    highlight_cells = set(highlight_cells or [])
+    shown = self._shown
+
+    for r in range(ROWS):
+      row, shown_row = board[r], shown[r]
+      for c in range(COLS):
+        v = row[c]
+        lit = (r, c) in highlight_cells
+        prev = shown_row[c]
+        if prev is not None and prev[0] == v and prev[1] == lit:
+          continue
+
+        cell = self.grid[r][c]
+        if prev is None or prev[0] != v:
+          cell.background = PIECE_COLOURS.get(v, PIECE_COLOURS[-1])
+        if prev is None or prev[1] != lit:
+          cell.border = HIGHLIGHT_BORDER if lit else BORDER
+        shown_row[c] = (v, lit)
+
+  def invalidate(self):
+    """Forget what's on screen so the next render redraws every cell."""
+    self._shown = [[None] * COLS for _ in range(ROWS)]
@@ -0,0 +1,131 @@
+import time
+import anvil.non_blocking
+
+# Model behind each difficulty's server-side game (start_game / play_move)
+SESSION_MODELS = {"medium": "tx", "hard": "cnn"}
+
+# Stateless server function (and leading args) per difficulty, used until the
+# game's session exists; "easy" is played locally
+SERVER_CALLS = {
+  "medium": ("bot_move_tx", ()),
+  "hard": ("bot_move", ("CNN",)),
+}
+
+# Seconds to wait for the uplink before playing the local fallback move
+DEADLINES = {"medium": 4.0, "hard": 3.0}
+
+# Why a move came from the local fallback, as shown in the status line
+FALLBACK_REASONS = {
+  "timeout": "server too slow",
+  "error": "server error",
+  "invalid": "server sent an unplayable move",
+}
+
+class BotSession:
+  """
+  Server-side game for one medium/hard game, so each move only sends the
+  human's column. `synced` is False once the server board may differ from
+  ours (moves made before `start_game` answered, or a local fallback move);
+  the next `play_move` then carries the whole move history to resync it.
+  """
+
+  def __init__(self, mode):
+    self.id = None
+    self.synced = True
+    self.closed = False
+    call = anvil.non_blocking.call_async("start_game", SESSION_MODELS[mode])
+    call.on_result(self._on_started)
+    # Without a session, moves keep using the stateless calls
+    call.on_error(lambda err: None)
+
+  def _on_started(self, session_id):
+    self.id = session_id
+    if self.closed:
+      self.close()
+
+  def close(self):
+    """End the server game early (it would expire on the server anyway)."""
+    self.closed = True
+    if self.id is not None:
+      call = anvil.non_blocking.call_async("end_game", self.id)
+      call.on_error(lambda err: None)
+      self.id = None
+
+class BotMoveRequest:
+  """
+  Asks the uplink for the bot's move without blocking the UI: through the
+  game's BotSession when it has one, else by sending the whole board.
+
+  `on_done(col, source, ms)` is called exactly once with the column, where
+  it came from and the time taken. `source` is "server", or the reason
+  the move came from `GameState.heuristic_move` instead: "error",
+  "invalid" (unplayable column) or "timeout" (missed the difficulty's
+  deadline; a late server reply is then ignored).
+  """
+
+  def __init__(self, mode, state, human_col, on_done, session=None):
+    self.state = state
+    self.on_done = on_done
+    self.session = session
+    self.done = False
+    self.started = time.time()
+
+    self._timer = anvil.non_blocking.defer(self._on_timeout, DEADLINES.get(mode, 3.0))
+    self._via_session = session is not None and session.id is not None
+    if self._via_session:
+      # Stones before the human's move, and the moves behind them if the server may have drifted
+      history = None if session.synced else state.history[:-1]
+      call = anvil.non_blocking.call_async("play_move", session.id, human_col, state.moves - 1, history)
+    else:
+      if session is not None:
+        session.synced = False
+      name, leading_args = SERVER_CALLS[mode]
+      call = anvil.non_blocking.call_async(name, *leading_args, state.board, human_col)
+    call.on_result(self._on_result)
+    call.on_error(self._on_error)
+
+  def cancel(self):
+    """Forget this request (new game / game ended); its callbacks become no-ops."""
+    if not self.done:
+      self.done = True
+      self._stop_timer()
+
+  def _stop_timer(self):
+    timer = getattr(self, "_timer", None)
+    if timer is not None:
+      timer.cancel()
+
+  def _finish(self, col, source):
+    if self.done:
+      return
+    self.done = True
+    self._stop_timer()
+    self.on_done(col, source, int(1000 * (time.time() - self.started)))
+
+  def _fallback(self, reason):
+    if self.done:
+      return
+    if self.session is not None:
+      # The server doesn't know this move
+      self.session.synced = False
+    self._finish(self.state.heuristic_move(-1), reason)
+
+  def _on_result(self, result):
+    if self.done:
+      return
+    # play_move answers with the game state, the stateless calls with the column
+    col = result.get("col") if isinstance(result, dict) else result
+    if col is None and self.state.is_full():
+      self._finish(None, "server")
+    elif isinstance(col, int) and self.state.can_play(col):
+      if self._via_session:
+        self.session.synced = True
+      self._finish(col, "server")
+    else:
+      self._fallback("invalid")
+
+  def _on_error(self, err):
+    self._fallback("error")
+
+  def _on_timeout(self):
+    self._fallback("timeout")
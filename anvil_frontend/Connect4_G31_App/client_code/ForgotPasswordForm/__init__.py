@@ -4,8 +4,8 @@ import anvil.server
 import anvil.tables as tables
 import anvil.tables.query as q
 from anvil.tables import app_tables
-import time
 import re
+from .. import Navigation
 
 
 class ForgotPasswordForm(ForgotPasswordFormTemplate):
@@ -151,7 +151,7 @@ class ForgotPasswordForm(ForgotPasswordFormTemplate):
 
     if ok:
       alert("Password updated successfully!", title="Success")
-      open_form("LoginForm")
+      Navigation.go("LoginForm")
     else:
       alert("Could not update password.")
 
@@ -170,8 +170,7 @@ class ForgotPasswordForm(ForgotPasswordFormTemplate):
   @handle("back_button", "click")
   def back_button_click(self, **event_args):
     """This method is called when the button is clicked"""
-    time.sleep(0.5)
-    open_form('LoginForm')
+    Navigation.go("LoginForm")
 
   @handle("info_icon_button", "click")
   def info_icon_button_click(self, **event_args):
@@ -0,0 +1,118 @@
+ROWS, COLS = 6, 7
+
+# (row step, col step) for horizontal, vertical and both diagonals
+DIRECTIONS = [(0, 1), (1, 0), (1, 1), (1, -1)]
+
+class GameState:
+  """
+  Client-side Connect 4 board shared by PlayForm and PlayFormGuest.
+
+  Keeps the column heights and the last move, so a drop is O(1) and
+  win detection only walks the four lines through the last piece
+  instead of scanning the whole board (Python runs slowly in Skulpt).
+  `board` is the 6x7 list sent to the server (row 0 = top).
+  """
+
+  def __init__(self):
+    self.reset()
+
+  def reset(self):
+    self.board = [[0 for _ in range(COLS)] for _ in range(ROWS)]
+    self.heights = [0] * COLS
+    self.moves = 0
+    self.last = None  # (row, col) of the last piece dropped
+    self.history = []  # every column played, first move first
+
+  # ---------------- MOVES ----------------
+
+  def can_play(self, col):
+    return 0 <= col < COLS and self.heights[col] < ROWS
+
+  def legal_moves(self):
+    return [c for c in range(COLS) if self.heights[c] < ROWS]
+
+  def drop(self, col, player):
+    """Drop `player` (+1 / -1) into `col`. Returns the row it landed in, or None if full."""
+    if not self.can_play(col):
+      return None
+    row = ROWS - 1 - self.heights[col]
+    self.board[row][col] = player
+    self.heights[col] += 1
+    self.moves += 1
+    self.last = (row, col)
+    self.history.append(col)
+    return row
+
+  def undo(self, col):
+    """Remove the top piece of `col` (used for look-ahead)."""
+    self.heights[col] -= 1
+    self.board[ROWS - 1 - self.heights[col]][col] = 0
+    self.moves -= 1
+    self.last = None
+    self.history.pop()
+
+  def is_full(self):
+    return self.moves >= ROWS * COLS
+
+  # ---------------- WIN DETECTION ----------------
+
+  def _line_through(self, row, col, player):
+    """Four aligned cells of `player` through (row, col), or None."""
+    board = self.board
+    for dr, dc in DIRECTIONS:
+      cells = [(row, col)]
+      for sign in (1, -1):
+        r, c = row + sign * dr, col + sign * dc
+        while 0 <= r < ROWS and 0 <= c < COLS and board[r][c] == player:
+          cells.append((r, c))
+          r += sign * dr
+          c += sign * dc
+      if len(cells) >= 4:
+        return cells[:4]
+    return None
+
+  def winning_cells(self):
+    """Winning line through the last piece dropped, or None."""
+    if self.last is None:
+      return None
+    row, col = self.last
+    return self._line_through(row, col, self.board[row][col])
+
+  def is_winning_move(self, col, player):
+    """True if dropping `player` into `col` would connect four (board unchanged)."""
+    if not self.can_play(col):
+      return False
+    row = ROWS - 1 - self.heights[col]
+    self.board[row][col] = player
+    won = self._line_through(row, col, player) is not None
+    self.board[row][col] = 0
+    return won
+
+  # ---------------- LOCAL POLICY ----------------
+
+  def heuristic_move(self, player):
+    """
+    Quick move for `player` with no server: win now, else block the
+    opponent's win, else the most central column that doesn't let the
+    opponent win by playing on top of it.
+    """
+    legal = self.legal_moves()
+    if not legal:
+      return None
+    for col in legal:
+      if self.is_winning_move(col, player):
+        return col
+    for col in legal:
+      if self.is_winning_move(col, -player):
+        return col
+
+    safe = []
+    last = self.last  # undo() can't know the previous last move
+    for col in legal:
+      self.drop(col, player)
+      gives_win = self.is_winning_move(col, -player)
+      self.undo(col)
+      self.last = last
+      if not gives_win:
+        safe.append(col)
+    return min(safe or legal, key=lambda c: abs(c - COLS // 2))
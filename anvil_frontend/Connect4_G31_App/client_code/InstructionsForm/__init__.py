@@ -4,7 +4,7 @@ import anvil.server
 import anvil.tables as tables
 import anvil.tables.query as q
 from anvil.tables import app_tables
-import time
+from .. import Navigation
 
 class InstructionsForm(InstructionsFormTemplate):
   def __init__(self, **properties):
@@ -16,12 +16,10 @@ class InstructionsForm(InstructionsFormTemplate):
   @handle("back_button", "click")
   def back_button_click(self, **event_args):
     """This method is called when the button is clicked"""
-    time.sleep(0.5)
-    open_form('PlayForm')
+    Navigation.go("PlayForm")
 
   @handle("logout_button", "click")
   def logout_button_click(self, **event_args):
     """This method is called when the button is clicked"""
-    time.sleep(0.5)
-    open_form("LoginForm")
+    Navigation.logout()
     alert("You have successfully logged out!", title="Logout", buttons=[("OK", True)])
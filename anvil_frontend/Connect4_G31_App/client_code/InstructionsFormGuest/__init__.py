@@ -4,7 +4,7 @@ import anvil.server
 import anvil.tables as tables
 import anvil.tables.query as q
 from anvil.tables import app_tables
-import time
+from .. import Navigation
 
 
 class InstructionsFormGuest(InstructionsFormGuestTemplate):
@@ -17,12 +17,10 @@ class InstructionsFormGuest(InstructionsFormGuestTemplate):
   @handle("back_button", "click")
   def back_button_click(self, **event_args):
     """This method is called when the button is clicked"""
-    time.sleep(0.5)
-    open_form("PlayFormGuest")
+    Navigation.go("PlayFormGuest")
 
   @handle("exit_button", "click")
   def exit_button_click(self, **event_args):
     """This method is called when the button is clicked"""
-    time.sleep(0.5)
-    open_form("LoginForm")
+    Navigation.logout()
     alert("You have successfully exited the game!", title="Exit", buttons=[("OK", True)])
@@ -4,7 +4,7 @@ import anvil.server
 import anvil.tables as tables
 import anvil.tables.query as q
 from anvil.tables import app_tables
-import time
+from .. import Navigation
 
 class LoginForm(LoginFormTemplate):
   def __init__(self, **properties):
@@ -47,8 +47,9 @@ class LoginForm(LoginFormTemplate):
         return
   
       # Normal users
-      time.sleep(0.5)
-      open_form("DashboardForm")
+      Navigation.go("DashboardForm")
+      # Build the game and instructions pages while the user looks at the dashboard
+      Navigation.preload("PlayForm", "InstructionsForm")
   
     else:
       alert("Incorrect username or password.")
@@ -61,11 +62,9 @@ class LoginForm(LoginFormTemplate):
       title="Come Back Later!",
       buttons=[("OK", True)]
     )
-    # time.sleep(0.5)
-    # open_form("PlayFormGuest")
+    # Navigation.go("PlayFormGuest")
 
   @handle("forgot_password", "click")
   def forgot_password_click(self, **event_args):
     """This method is called when the button is clicked"""
-    time.sleep(0.5)
-    open_form('ForgotPasswordForm')
+    Navigation.go("ForgotPasswordForm")
@@ -0,0 +1,59 @@
+from anvil import open_form
+import anvil.non_blocking
+
+# Forms kept alive for the whole session: reopening one keeps its game,
+# stats and already-styled board instead of building it again.
+# LoginForm and ForgotPasswordForm are always built fresh (they hold credentials).
+CACHED_FORMS = (
+  "DashboardForm", "PlayForm", "InstructionsForm", "WriteupForm",
+  "PlayFormGuest", "InstructionsFormGuest",
+)
+
+_forms = {}
+
+def _form_class(name):
+  # Imported on first use so loading this module doesn't pull in every form
+  if name == "DashboardForm":
+    from .DashboardForm import DashboardForm
+    return DashboardForm
+  if name == "PlayForm":
+    from .PlayForm import PlayForm
+    return PlayForm
+  if name == "InstructionsForm":
+    from .InstructionsForm import InstructionsForm
+    return InstructionsForm
+  if name == "WriteupForm":
+    from .WriteupForm import WriteupForm
+    return WriteupForm
+  if name == "PlayFormGuest":
+    from .PlayFormGuest import PlayFormGuest
+    return PlayFormGuest
+  if name == "InstructionsFormGuest":
+    from .InstructionsFormGuest import InstructionsFormGuest
+    return InstructionsFormGuest
+  raise ValueError(f"{name} is not a cached form")
+
+def get_form(name):
+  """The session's instance of a cached form, built on first use."""
+  form = _forms.get(name)
+  if form is None:
+    form = _forms[name] = _form_class(name)()
+  return form
+
+def go(name):
+  """Navigate to a form by name, reusing the cached instance where there is one."""
+  if name in CACHED_FORMS:
+    open_form(get_form(name))
+  else:
+    open_form(name)
+
+def preload(*names):
+  """Build forms in the background, one per event-loop turn, so the first visit is instant."""
+  for name in names:
+    if name not in _forms:
+      anvil.non_blocking.defer(lambda name=name: get_form(name), 0)
+
+def logout():
+  """Drop every cached form (the next user starts clean) and go back to login."""
+  _forms.clear()
+  open_form("LoginForm")
@@ -4,29 +4,20 @@ import anvil.server
 import anvil.js
 from anvil.js.window import navigator
 import random
-import time
 
-ROWS, COLS = 6, 7
+from ..GameState import GameState, ROWS, COLS
+from ..BoardRenderer import BoardRenderer
+from ..BotClient import BotMoveRequest, BotSession, FALLBACK_REASONS, SESSION_MODELS
+from .. import Navigation
 
 class PlayForm(PlayFormTemplate):
 
   def __init__(self, **properties):
     self.init_components(**properties)
 
-    # --- Block mobile devices ---
+    # --- Block mobile devices (enforced on show; the form may be preloaded in the background) ---
     ua = (navigator.userAgent or "").lower()
-    is_mobile = any(k in ua for k in ["android", "iphone", "ipad", "ipod", "mobile"])
-
-    if is_mobile:
-      alert(
-        "This game is not optimized for mobile devices.\n"
-        "Please use a laptop/desktop for the best experience.",
-        title="Unsupported Device",
-        buttons=[("OK", True)]
-      )
-      time.sleep(0.5)
-      open_form("LoginForm")   # force logout / send to login
-      return
+    self._is_mobile = any(k in ua for k in ["android", "iphone", "ipad", "ipod", "mobile"])
 
     # --- Stats per difficulty ---
     self.stats = {
@@ -54,13 +45,18 @@ class PlayForm(PlayFormTemplate):
     self.game_over = False
     self._counted_this_game = False
     self._ui_locked = False  # prevents double-clicks while bot thinks
+    self._pending = None     # BotMoveRequest waiting on the server
+    self._session = None     # BotSession of the current medium/hard game
 
-    self.board = [[0 for _ in range(COLS)] for _ in range(ROWS)]
+    # Board, column heights and last move; `self.board` is the list sent to the server
+    self.state = GameState()
+    self.board = self.state.board
     self.status_label.text = "Click 'New Game' to start."
 
     # Collect the 6x7 labels from row0_flow ... row5_flow
     self.grid = self._collect_grid_labels()
     self._style_grid_labels()
+    self.renderer = BoardRenderer(self.grid)
     self.render_board()
 
     # Initial stats display
@@ -69,6 +65,17 @@ class PlayForm(PlayFormTemplate):
     # Ensure UI is enabled at start
     self.set_ui_enabled(True)
 
+  @handle("", "show")
+  def form_show(self, **event_args):
+    if self._is_mobile:
+      alert(
+        "This game is not optimized for mobile devices.\n"
+        "Please use a laptop/desktop for the best experience.",
+        title="Unsupported Device",
+        buttons=[("OK", True)]
+      )
+      Navigation.logout()   # force logout / send to login
+
   # ---------------- UI LOCK/UNLOCK ----------------
 
   def set_ui_enabled(self, enabled: bool):
@@ -125,61 +132,13 @@ class PlayForm(PlayFormTemplate):
         cell.role = "connect4_cell"
 
   def render_board(self, highlight_cells=None):
-    highlight_cells = set(highlight_cells or [])
-
-    for r in range(ROWS):
-      for c in range(COLS):
-        cell = self.grid[r][c]
-        v = self.board[r][c]
-
-        if v == 0:
-          cell.background = "#f2f2f2"
-        elif v == +1:
-          cell.background = "#f1c40f"
-        else:
-          cell.background = "#e74c3c"
-
-        cell.border = "2px solid #333"
-        if (r, c) in highlight_cells:
-          cell.border = "5px solid #00ff00"
+    # Only cells whose piece or highlight changed since the last render are touched
+    self.renderer.render(self.board, highlight_cells)
 
   # ---------------- GAME HELPERS ----------------
 
-  def find_winner_cells(self, player):
-    directions = [(0, 1), (1, 0), (1, 1), (1, -1)]
-    for r in range(ROWS):
-      for c in range(COLS):
-        if self.board[r][c] != player:
-          continue
-        for dr, dc in directions:
-          cells = [(r, c)]
-          rr, cc = r, c
-          for _ in range(3):
-            rr += dr
-            cc += dc
-            if not (0 <= rr < ROWS and 0 <= cc < COLS):
-              break
-            if self.board[rr][cc] != player:
-              break
-            cells.append((rr, cc))
-          if len(cells) == 4:
-            return cells
-    return None
-
-  def board_full(self):
-    return all(self.board[0][c] != 0 for c in range(COLS))
-
-  def drop_piece(self, col, player):
-    for r in range(ROWS - 1, -1, -1):
-      if self.board[r][col] == 0:
-        self.board[r][col] = player
-        return True
-    return False
-
   def bot_move_simple(self):
-    if self.board_full():
-      return None
-    valid_cols = [c for c in range(COLS) if self.board[0][c] == 0]
+    valid_cols = self.state.legal_moves()
     return random.choice(valid_cols) if valid_cols else None
 
   def _get_selected_mode(self):
@@ -295,75 +254,82 @@ class PlayForm(PlayFormTemplate):
       self.status_label.text = "Game over. Click 'New Game' to start again."
       return
 
-    if self.board[0][col] != 0:
+    if not self.state.can_play(col):
       self.status_label.text = "That column is full."
       return
 
     # Human move
-    self.drop_piece(col, +1)
-    self.render_board()
-
-    win_cells = self.find_winner_cells(+1)
+    self.state.drop(col, +1)
+    win_cells = self.state.winning_cells()
+    self.render_board(highlight_cells=win_cells)
     if win_cells:
-      self.render_board(highlight_cells=win_cells)
       self.status_label.text = "🎉 You win! Click 'New Game' to play again."
       self.end_game("win")
       self.show_end_popup("win")
       return
 
-    if self.board_full():
+    if self.state.is_full():
       self.status_label.text = "🤝 Draw! Click 'New Game' to play again."
       self.end_game("draw")
       return
 
     # Bot move
     mode = self.current_mode or self._get_selected_mode()
+    if mode == "easy":
+      self._apply_bot_move(col, self.bot_move_simple())
+      return
+
     self.status_label.text = "🤖 Bot thinking..."
-    # Disable UI while waiting for bot response
+    # Lock the controls until the reply (or the local fallback) arrives; the page itself stays responsive
     self.set_ui_enabled(False)
-    time.sleep(0.5)
-
-    try:
-      if mode == "easy":
-        bot_col = self.bot_move_simple()
-      elif mode == "medium":
-        bot_col = anvil.server.call("bot_move_tx", self.board, col) # ✅ pass human col 
-      else:
-        bot_col = anvil.server.call("bot_move", "CNN", self.board, col) # ✅ pass human col
-    finally:
-      # Always re-enable UI even if bot call errors
-      self.set_ui_enabled(True)
+    self._pending = BotMoveRequest(
+      mode, self.state, col,
+      lambda bot_col, source, ms: self._on_bot_move(col, bot_col, source, ms),
+      session=self._session,
+    )
+
+  def _on_bot_move(self, col, bot_col, source, ms):
+    self._pending = None
+    self.set_ui_enabled(True)
+    note = f" in {ms} ms"
+    if source != "server":
+      note += f" (local move: {FALLBACK_REASONS.get(source, source)})"
+    self._apply_bot_move(col, bot_col, note)
 
+  def _apply_bot_move(self, col, bot_col, note=""):
     if bot_col is None:
       self.status_label.text = "🤝 Draw! Click 'New Game' to play again."
       self.end_game("draw")
       return
 
-    if not (0 <= int(bot_col) < COLS) or self.board[0][int(bot_col)] != 0:
+    if not (0 <= int(bot_col) < COLS) or not self.state.can_play(int(bot_col)):
       self.status_label.text = "⚠️ Bot returned an invalid move. Ending game as No Result."
       self.end_game("no_result")
       return
 
     bot_col = int(bot_col)
 
-    self.drop_piece(bot_col, -1)
-    self.render_board()
-
-    win_cells = self.find_winner_cells(-1)
+    self.state.drop(bot_col, -1)
+    win_cells = self.state.winning_cells()
+    self.render_board(highlight_cells=win_cells)
     if win_cells:
-      self.render_board(highlight_cells=win_cells)
       self.status_label.text = f"🤖 Bot wins (played {bot_col}). Click 'New Game' to try again."
       self.end_game("loss")
       self.show_end_popup("loss")
       return
 
-    if self.board_full():
+    if self.state.is_full():
       self.status_label.text = "🤝 Draw! Click 'New Game' to play again."
       self.end_game("draw")
       self.show_end_popup("draw")
       return
 
-    self.status_label.text = f"You played {col}. Bot played {bot_col}. Your turn!"
+    self.status_label.text = f"You played {col}. Bot played {bot_col}{note}. Your turn!"
+
+  def _close_session(self):
+    if self._session is not None:
+      self._session.close()
+      self._session = None
 
   # ---------------- BUTTON HANDLERS ----------------
 
@@ -387,7 +353,14 @@ class PlayForm(PlayFormTemplate):
     # Store selected mode normally
     self.current_mode = self._get_selected_mode()
 
-    self.board = [[0 for _ in range(COLS)] for _ in range(ROWS)]
+    if self._pending is not None:
+      self._pending.cancel()
+      self._pending = None
+    self._close_session()
+    if self.current_mode in SESSION_MODELS:
+      self._session = BotSession(self.current_mode)
+    self.state.reset()
+    self.board = self.state.board
     self.game_started = True
     self.game_over = False
     self._counted_this_game = False
@@ -419,13 +392,12 @@ class PlayForm(PlayFormTemplate):
 
   @handle("back_button", "click")
   def back_button_click(self, **event_args):
-    time.sleep(0.5)
-    open_form("DashboardForm")
+    Navigation.go("DashboardForm")
 
   @handle("logout_button", "click")
   def logout_button_click(self, **event_args):
-    time.sleep(0.5)
-    open_form("LoginForm")
+    self._close_session()
+    Navigation.logout()
     alert("You have successfully logged out!", title="Logout", buttons=[("OK", True)])
 
   @handle("end_game_button", "click")
@@ -462,6 +434,5 @@ class PlayForm(PlayFormTemplate):
   @handle("gameplay_instructions_button", "click")
   def gameplay_instructions_button_click(self, **event_args):
     """This method is called when the link is clicked"""
-    time.sleep(0.5)
-    open_form("InstructionsForm")
+    Navigation.go("InstructionsForm")
 
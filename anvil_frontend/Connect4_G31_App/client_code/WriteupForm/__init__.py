@@ -4,7 +4,7 @@ import anvil.server
 import anvil.tables as tables
 import anvil.tables.query as q
 from anvil.tables import app_tables
-import time
+from .. import Navigation
 
 class WriteupForm(WriteupFormTemplate):
   def __init__(self, **properties):
@@ -16,25 +16,21 @@ class WriteupForm(WriteupFormTemplate):
   @handle("back_button", "click")
   def back_button_click(self, **event_args):
     """This method is called when the button is clicked"""
-    time.sleep(0.5)
-    open_form("DashboardForm")
+    Navigation.go("DashboardForm")
 
   @handle("logout_button", "click")
   def logout_button_click(self, **event_args):
     """This method is called when the button is clicked"""
-    time.sleep(0.5)
-    open_form("LoginForm")
+    Navigation.logout()
     alert("You have successfully logged out!", title="Logout", buttons=[("OK", True)])
 
   @handle("back_button_2", "click")
   def back_button_2_click(self, **event_args):
     """This method is called when the button is clicked"""
-    time.sleep(0.5)
-    open_form("DashboardForm")
+    Navigation.go("DashboardForm")
 
   @handle("logout_button_2", "click")
   def logout_button_2_click(self, **event_args):
     """This method is called when the button is clicked"""
-    time.sleep(0.5)
-    open_form("LoginForm")
+    Navigation.logout()
     alert("You have successfully logged out!", title="Logout", buttons=[("OK", True)])
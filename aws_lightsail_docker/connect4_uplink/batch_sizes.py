@@ -0,0 +1,37 @@
+import os
+
+import numpy as np
+
+DEFAULT_BATCH_SIZES = "1,4,8,16,32,64"
+
+def check_batch_sizes(sizes):
+  """Sorted, de-duplicated tuple of positive sizes; ValueError if there are none."""
+  sizes = tuple(sorted({int(n) for n in sizes}))
+  if not sizes or sizes[0] < 1:
+    raise ValueError(f"batch sizes must be positive integers, got {sizes!r}")
+  return sizes
+
+def env_batch_sizes(var, default=DEFAULT_BATCH_SIZES):
+  """Batch sizes from a comma-separated env var, checked when the module loads."""
+  value = os.getenv(var, default)
+  try:
+    return check_batch_sizes(n for n in value.split(",") if n.strip())
+  except ValueError:
+    raise ValueError(f"{var} must list positive batch sizes, got {value!r}") from None
+
+def run_padded(fn, batch, sizes):
+  """
+  `fn` over an (N,...) batch using only shapes from `sizes`: each chunk is
+  zero-padded up to the next size, larger batches run in chunks of the biggest.
+  """
+  batch = np.asarray(batch, dtype=np.float32)
+  largest = sizes[-1]
+  out = []
+  for i in range(0, max(len(batch), 1), largest):
+    chunk = batch[i:i + largest]
+    n = len(chunk)
+    size = next(s for s in sizes if s >= n)
+    if size != n:
+      chunk = np.concatenate([chunk, np.zeros((size - n,) + batch.shape[1:], dtype=np.float32)])
+    out.append(np.asarray(fn(chunk))[:n])
+  return np.concatenate(out)
@@ -0,0 +1,164 @@
+import os
+import queue
+import threading
+import time
+
+import numpy as np
+
+from jsonlog import LOG
+from metrics import METRICS
+
+BATCH_MAX_SIZE = int(os.getenv("BATCH_MAX_SIZE", "32"))
+BATCH_WINDOW_MS = float(os.getenv("BATCH_WINDOW_MS", "2"))
+BATCH_REPORT_SECS = float(os.getenv("BATCH_REPORT_SECS", "60"))
+
+class _Request:
+  __slots__ = ("x", "caller", "enqueued", "done", "result", "error")
+
+  def __init__(self, x, caller):
+    self.x = x
+    self.caller = caller
+    self.enqueued = time.perf_counter()
+    self.done = threading.Event()
+    self.result = None
+    self.error = None
+
+class MicroBatcher:
+  """
+  Collects boards from concurrent callers for up to `window_ms` (or until
+  `max_batch` boards are waiting), runs one batched forward pass and hands
+  each caller its own row of the output. When every active caller's boards
+  are already collected, the batch runs without waiting out the window.
+
+  `predict_fn` takes an (N,6,7,2) float32 array and returns (N,7) scores.
+  Calling the batcher itself has the same signature, so it can stand in
+  for `predict_fn` anywhere.
+  """
+
+  def __init__(self, predict_fn, name="model", max_batch=BATCH_MAX_SIZE,
+               window_ms=BATCH_WINDOW_MS, report_secs=BATCH_REPORT_SECS):
+    self.predict_fn = predict_fn
+    self.name = name
+    self.max_batch = max(1, int(max_batch))
+    self.window = max(0.0, window_ms) / 1000.0
+    self.report_secs = report_secs
+
+    self._queue = queue.Queue()
+    self._lock = threading.Lock()
+    self._callers = 0  # calls in progress
+    self._reset_stats()
+    self._last_report = time.perf_counter()
+
+    self._worker = threading.Thread(target=self._run, name=f"batcher-{name}", daemon=True)
+    self._worker.start()
+
+  # ---------------- CALLER SIDE ----------------
+
+  def __call__(self, batch):
+    caller = object()
+    reqs = [_Request(x, caller) for x in batch]
+    with self._lock:
+      self._callers += 1
+    try:
+      for req in reqs:
+        self._queue.put(req)
+      for req in reqs:
+        req.done.wait()
+        if req.error is not None:
+          raise req.error
+    finally:
+      with self._lock:
+        self._callers -= 1
+    return np.stack([req.result for req in reqs])
+
+  # ---------------- WORKER SIDE ----------------
+
+  def _collect(self):
+    first = self._queue.get()
+    reqs = [first]
+    deadline = time.perf_counter() + self.window
+    while len(reqs) < self.max_batch:
+      try:
+        reqs.append(self._queue.get_nowait())
+        continue
+      except queue.Empty:
+        pass
+      # Nobody else can join this batch: run it now instead of waiting out the window
+      if self._callers <= len({req.caller for req in reqs}):
+        break
+      remaining = deadline - time.perf_counter()
+      if remaining <= 0:
+        break
+      try:
+        reqs.append(self._queue.get(timeout=remaining))
+      except queue.Empty:
+        break
+    return reqs
+
+  def _run(self):
+    while True:
+      reqs = self._collect()
+      started = time.perf_counter()
+      try:
+        out = np.asarray(self.predict_fn(np.stack([r.x for r in reqs]).astype(np.float32, copy=False)))
+        for i, req in enumerate(reqs):
+          req.result = out[i]
+      except Exception as e:
+        for req in reqs:
+          req.error = e
+      finished = time.perf_counter()
+
+      for req in reqs:
+        req.done.set()
+
+      self._record(reqs, started, finished)
+
+  # ---------------- STATS ----------------
+
+  def _reset_stats(self):
+    self._batches = 0
+    self._requests = 0
+    self._size_hist = {}
+    self._wait_total = 0.0
+    self._wait_max = 0.0
+    self._infer_total = 0.0
+
+  def _record(self, reqs, started, finished):
+    with self._lock:
+      n = len(reqs)
+      self._batches += 1
+      self._requests += n
+      self._size_hist[n] = self._size_hist.get(n, 0) + 1
+      for req in reqs:
+        wait = started - req.enqueued
+        self._wait_total += wait
+        if wait > self._wait_max:
+          self._wait_max = wait
+      self._infer_total += finished - started
+
+    for req in reqs:
+      METRICS.observe("queue_wait", self.name, started - req.enqueued)
+    METRICS.observe("forward", self.name, finished - started)
+
+    if self.report_secs and finished - self._last_report >= self.report_secs:
+      self._last_report = finished
+      # Never block the worker (and every waiting caller) on stdout
+      LOG.info("batcher_stats", model=self.name, **self.stats(reset=True))
+
+  def stats(self, reset=False):
+    """Achieved batch sizes and queue wait since start (or the last reset)."""
+    with self._lock:
+      batches = self._batches or 1
+      requests = self._requests or 1
+      out = {
+        "batches": self._batches,
+        "requests": self._requests,
+        "avg_batch_size": round(self._requests / batches, 2),
+        "batch_size_hist": dict(sorted(self._size_hist.items())),
+        "avg_queue_wait_ms": round(1000.0 * self._wait_total / requests, 3),
+        "max_queue_wait_ms": round(1000.0 * self._wait_max, 3),
+        "avg_forward_ms": round(1000.0 * self._infer_total / batches, 3),
+      }
+      if reset:
+        self._reset_stats()
+    return out
@@ -0,0 +1,186 @@
+"""
+Offline micro-benchmarks for the inference hot path.
+
+  python bench.py --out bench.json                 # all models, default settings
+  python bench.py --models cnn --boards 500 --repeats 3
+
+Runs against the real model files (default: the `models/` folder next to
+this script) on seeded random-play boards of varied depth, and reports
+p50/p95/p99 latency and throughput per stage as JSON so runs before and
+after a change can be diffed.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+DEFAULT_MODEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "models")
+
+##################################### Timing #####################################
+
+def summarize(samples):
+  """Latency percentiles (ms) and throughput (calls/s) for a list of durations in seconds."""
+  a = np.asarray(samples, dtype=np.float64) * 1000.0
+  return {
+    "n": int(a.size),
+    "mean_ms": round(float(a.mean()), 4),
+    "p50_ms": round(float(np.percentile(a, 50)), 4),
+    "p95_ms": round(float(np.percentile(a, 95)), 4),
+    "p99_ms": round(float(np.percentile(a, 99)), 4),
+    "throughput_per_s": round(1000.0 / float(a.mean()), 1) if a.mean() > 0 else None,
+  }
+
+def time_each(fn, items, repeats):
+  """Call `fn(item)` for every item, `repeats` times over; one duration per call."""
+  samples = []
+  for _ in range(repeats):
+    for item in items:
+      t0 = time.perf_counter()
+      fn(item)
+      samples.append(time.perf_counter() - t0)
+  return samples
+
+##################################### Stages #####################################
+
+def bench_player(player, boards, repeats, batch_sizes):
+  """encode / forward / masking / end-to-end get_move for one PolicyPlayer (batcher and cache bypassed)."""
+  from game_logic import best_legal_columns, legal_mask
+
+  saved = player.predictor, player.cache
+  player.predictor = player.predict_batch
+  player.cache = None
+
+  encoded = [player.board_to_input(b, "minus").copy() for b in boards]
+  scores = [np.asarray(player.predict_batch(x)) for x in encoded]
+  player.get_move(boards[0], color="minus")  # make sure any lazy setup is done
+
+  out = {
+    "encode": summarize(time_each(lambda b: player.board_to_input(b, "minus"), boards, repeats)),
+    "forward": summarize(time_each(player.predict_batch, encoded, repeats)),
+    "masking": summarize(time_each(
+      lambda i: best_legal_columns(scores[i], legal_mask(boards[i][None])), range(len(boards)), repeats)),
+    "get_move": summarize(time_each(lambda b: player.get_move(b, color="minus"), boards, repeats)),
+  }
+
+  for size in batch_sizes:
+    chunks = [boards[i:i + size] for i in range(0, len(boards) - size + 1, size)]
+    if not chunks:
+      continue
+    inputs = [player.boards_to_input(c, "minus").copy() for c in chunks]
+    stats = summarize(time_each(player.predict_batch, inputs, repeats))
+    stats["boards_per_s"] = round(stats["throughput_per_s"] * size, 1) if stats["throughput_per_s"] else None
+    out[f"forward_batch{size}"] = stats
+
+  player.predictor, player.cache = saved
+  return out
+
+def bench_patch_h5(cnn_path, repeats):
+  """Cold `patch_h5_batch_shape` (fresh cache dir every time) and the cached fast path."""
+  from connect4 import patch_h5_batch_shape
+
+  cold, warm = [], []
+  for _ in range(repeats):
+    with tempfile.TemporaryDirectory() as cache_dir:
+      t0 = time.perf_counter()
+      patch_h5_batch_shape(cnn_path, cache_dir=cache_dir)
+      cold.append(time.perf_counter() - t0)
+      t0 = time.perf_counter()
+      patch_h5_batch_shape(cnn_path, cache_dir=cache_dir)
+      warm.append(time.perf_counter() - t0)
+  return {"cold": summarize(cold), "cached": summarize(warm)}
+
+def bench_bot_move_tx(boards, repeats):
+  """End-to-end `bot_move_tx` through the registry (batcher on, position cache cleared each pass)."""
+  import uplink_server
+  from position_cache import PositionCache
+
+  uplink_server.openings = None
+  # Background ponder passes would overlap the timings and fill the "uncached" cache
+  uplink_server.ponderer.enabled = False
+  player = uplink_server.registry.get("tx")
+  lists = [b.astype(int).tolist() for b in boards]
+
+  samples = []
+  with contextlib.redirect_stdout(io.StringIO()):
+    uplink_server.bot_move_tx(lists[0])
+    for _ in range(repeats):
+      player.cache = PositionCache(name="tx")
+      samples.extend(time_each(uplink_server.bot_move_tx, lists, 1))
+    cached = time_each(uplink_server.bot_move_tx, lists, 1)
+  return {"uncached": summarize(samples), "cached": summarize(cached)}
+
+##################################### Main #####################################
+
+def main():
+  parser = argparse.ArgumentParser(description="Connect4 inference micro-benchmarks")
+  parser.add_argument("--model-dir", default=os.getenv("MODEL_DIR", DEFAULT_MODEL_DIR))
+  parser.add_argument("--models", default="cnn,tx")
+  parser.add_argument("--boards", type=int, default=200, help="number of random-play boards")
+  parser.add_argument("--seed", type=int, default=0)
+  parser.add_argument("--repeats", type=int, default=5)
+  parser.add_argument("--batch-sizes", default="8,32")
+  parser.add_argument("--out", default="-", help="JSON output path ('-' for stdout)")
+  args = parser.parse_args()
+
+  # The serving modules read MODEL_DIR at import time
+  os.environ["MODEL_DIR"] = args.model_dir
+  from bitboard import random_positions
+  from jsonlog import LOG
+
+  # Structured log lines are written from a background thread; keep them off the JSON report
+  LOG.stream = sys.stderr
+
+  positions = random_positions(args.boards, seed=args.seed, min_moves=0, max_moves=35)
+  boards = np.stack([pos.to_array() for pos in positions])
+  batch_sizes = [int(b) for b in args.batch_sizes.split(",") if b]
+  models = [m.strip() for m in args.models.split(",") if m.strip()]
+
+  report = {
+    "meta": {
+      "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+      "python": platform.python_version(),
+      "machine": platform.machine(),
+      "model_dir": args.model_dir,
+      "backend": os.getenv("INFERENCE_BACKEND", "tf"),
+      "cnn_predict_mode": os.getenv("CNN_PREDICT_MODE", "function"),
+      "boards": len(boards),
+      "mean_depth": round(float(np.mean([pos.moves for pos in positions])), 2),
+      "seed": args.seed,
+      "repeats": args.repeats,
+    },
+    "results": {},
+  }
+
+  # Keep model-loading chatter off stdout so `--out -` stays valid JSON
+  with contextlib.redirect_stdout(sys.stderr):
+    import uplink_server
+  for name in models:
+    t0 = time.perf_counter()
+    with contextlib.redirect_stdout(sys.stderr):
+      player = uplink_server.registry.get(name)
+    report["results"][f"{name}.load_s"] = round(time.perf_counter() - t0, 3)
+    report["results"][name] = bench_player(player, boards, args.repeats, batch_sizes)
+
+  # The H5 patch only applies to the TensorFlow backend (the slim TFLite image has no h5py)
+  if "cnn" in models and uplink_server.INFERENCE_BACKEND != "tflite":
+    report["results"]["cnn"]["patch_h5_batch_shape"] = bench_patch_h5(uplink_server.CNN_PATH, args.repeats)
+  if "tx" in models:
+    report["results"]["tx"]["bot_move_tx"] = bench_bot_move_tx(boards, args.repeats)
+
+  text = json.dumps(report, indent=2)
+  if args.out == "-":
+    print(text)
+  else:
+    with open(args.out, "w") as f:
+      f.write(text)
+    print(f"✓ Wrote {args.out}", file=sys.stderr)
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,205 @@
+import random
+
+import numpy as np
+
+ROWS, COLS = 6, 7
+H1 = ROWS + 1  # bits per column (6 playable cells + 1 sentinel bit)
+
+PLUS, MINUS, EMPTY = 1, -1, 0
+
+##################################### Bit Layout #####################################
+#
+#  Column c owns bits c*7 .. c*7+6. Bit c*7+h is the cell h rows above the
+#  bottom of column c; bit c*7+6 is an always-empty sentinel that stops
+#  horizontal/diagonal shifts from wrapping into the next column.
+#
+#  Board row r (0 = top row, as sent by the forms) maps to h = ROWS - 1 - r.
+#
+
+BOTTOM_MASK = sum(1 << (c * H1) for c in range(COLS))
+BOARD_MASK = BOTTOM_MASK * ((1 << ROWS) - 1)
+TOP_MASK = BOTTOM_MASK << (ROWS - 1)
+
+def column_mask(col):
+  """All playable cells of a column."""
+  return ((1 << ROWS) - 1) << (col * H1)
+
+def cell_bit(row, col):
+  """Bit for board[row][col] (row 0 = top)."""
+  return 1 << (col * H1 + ROWS - 1 - row)
+
+def mirror_bits(bb):
+  """Reflect a bitboard left<->right (column c -> column 6-c)."""
+  out = 0
+  col_bits = (1 << H1) - 1
+  for c in range(COLS):
+    out |= ((bb >> (c * H1)) & col_bits) << ((COLS - 1 - c) * H1)
+  return out
+
+def has_four(bb):
+  """True if the bitboard contains four aligned stones."""
+  # vertical, horizontal, diagonal "/", diagonal "\"
+  for shift in (1, H1, H1 + 1, H1 - 1):
+    m = bb & (bb >> shift)
+    if m & (m >> (2 * shift)):
+      return True
+  return False
+
+##################################### Position #####################################
+
+class Position:
+  """
+  Compact Connect4 position: one bitboard per colour plus column heights.
+  Drop, undo, legality and win tests are all O(1) bit operations.
+  """
+
+  __slots__ = ("plus", "minus", "heights", "moves")
+
+  def __init__(self, plus=0, minus=0, heights=None, moves=0):
+    self.plus = plus
+    self.minus = minus
+    self.heights = list(heights) if heights is not None else [c * H1 for c in range(COLS)]
+    self.moves = moves
+
+  # ---------------- CONVERSION ----------------
+
+  @classmethod
+  def from_board(cls, board):
+    """Build from a 6x7 nested list or NumPy array (+1 / -1 / 0)."""
+    plus = minus = 0
+    heights = [c * H1 for c in range(COLS)]
+    moves = 0
+    for c in range(COLS):
+      for r in range(ROWS - 1, -1, -1):
+        v = board[r][c]
+        if v > 0.5:
+          plus |= cell_bit(r, c)
+        elif v < -0.5:
+          minus |= cell_bit(r, c)
+        else:
+          break
+        heights[c] += 1
+        moves += 1
+    return cls(plus, minus, heights, moves)
+
+  def to_board(self):
+    """6x7 nested list of ints, row 0 = top (the format the forms send)."""
+    board = [[EMPTY] * COLS for _ in range(ROWS)]
+    for r in range(ROWS):
+      for c in range(COLS):
+        bit = cell_bit(r, c)
+        if self.plus & bit:
+          board[r][c] = PLUS
+        elif self.minus & bit:
+          board[r][c] = MINUS
+    return board
+
+  def to_array(self, dtype=np.float32):
+    """6x7 NumPy array in the same layout as `to_board`."""
+    return np.array(self.to_board(), dtype=dtype)
+
+  def copy(self):
+    return Position(self.plus, self.minus, self.heights, self.moves)
+
+  def mirror(self):
+    """Horizontally reflected copy of this position."""
+    heights = [c * H1 + self.heights[COLS - 1 - c] - (COLS - 1 - c) * H1 for c in range(COLS)]
+    return Position(mirror_bits(self.plus), mirror_bits(self.minus), heights, self.moves)
+
+  # ---------------- STATE ----------------
+
+  @property
+  def mask(self):
+    """Occupied cells of both colours."""
+    return self.plus | self.minus
+
+  @property
+  def side_to_move(self):
+    """PLUS moves first, so the side to move follows from the move count."""
+    return PLUS if self.moves % 2 == 0 else MINUS
+
+  def stones(self, piece):
+    return self.plus if piece == PLUS else self.minus
+
+  def key(self):
+    """
+    Unique 49-bit key relative to the side to move
+    (its stones + occupied mask + bottom row).
+    """
+    return self.stones(self.side_to_move) + self.mask + BOTTOM_MASK
+
+  def is_full(self):
+    return self.moves >= ROWS * COLS
+
+  # ---------------- MOVES ----------------
+
+  def legal_mask(self):
+    """Bitboard of the next playable cell in every non-full column."""
+    return (self.mask + BOTTOM_MASK) & BOARD_MASK
+
+  def can_play(self, col):
+    return self.heights[col] < col * H1 + ROWS
+
+  def legal_moves(self):
+    return [c for c in range(COLS) if self.heights[c] < c * H1 + ROWS]
+
+  def drop(self, col, piece=None):
+    """Drop a piece (default: side to move) into `col`. Returns the bit set."""
+    if piece is None:
+      piece = self.side_to_move
+    bit = 1 << self.heights[col]
+    if piece == PLUS:
+      self.plus |= bit
+    else:
+      self.minus |= bit
+    self.heights[col] += 1
+    self.moves += 1
+    return bit
+
+  def undo(self, col):
+    """Remove the top piece of `col`."""
+    self.heights[col] -= 1
+    bit = ~(1 << self.heights[col])
+    self.plus &= bit
+    self.minus &= bit
+    self.moves -= 1
+
+  # ---------------- WIN TESTS ----------------
+
+  def has_won(self, piece):
+    return has_four(self.stones(piece))
+
+  def is_winning_move(self, col, piece=None):
+    """True if dropping `piece` into `col` connects four."""
+    if piece is None:
+      piece = self.side_to_move
+    bit = 1 << self.heights[col]
+    return has_four(self.stones(piece) | bit)
+
+  def winner(self):
+    if has_four(self.plus):
+      return PLUS
+    if has_four(self.minus):
+      return MINUS
+    return None
+
+##################################### Sample Positions #####################################
+
+def random_positions(n, seed=0, min_moves=0, max_moves=30):
+  """
+  `n` seeded random-play positions of varied depth. Games that end early
+  stop at the last non-terminal position.
+  """
+  rng = random.Random(seed)
+  out = []
+  for _ in range(n):
+    pos = Position()
+    target = rng.randint(min_moves, max_moves)
+    while pos.moves < target:
+      legal = pos.legal_moves()
+      col = rng.choice(legal)
+      if pos.is_winning_move(col) or pos.moves + 1 >= ROWS * COLS:
+        break
+      pos.drop(col)
+    out.append(pos)
+  return out
@@ -0,0 +1,10 @@
+import anvil.server
+
+# name -> function for everything exposed over the uplink, so other front
+# doors (the local gateway) serve exactly the same callables
+CALLABLES = {}
+
+def uplink_callable(fn):
+  """`@anvil.server.callable` that also records the function in CALLABLES"""
+  CALLABLES[fn.__name__] = fn
+  return anvil.server.callable(fn)
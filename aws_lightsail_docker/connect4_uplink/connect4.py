@@ -1,9 +1,10 @@
-import numpy as np
-import tensorflow as tf
-from tensorflow.keras import layers, models
-from tensorflow import keras
 import os, json
-import h5py
+
+# Game logic lives in game_logic (re-exported here); TensorFlow, Keras and
+# h5py are imported only when a CNN model is actually loaded.
+from batch_sizes import env_batch_sizes, run_padded
+from game_logic import PolicyPlayer, find_legal
+from startup_profile import phase
 
 ##################################### CNN Model `batch_shape` to `batch_input_shape` Helper Function #####################################
 
@@ -19,20 +20,21 @@ def _replace_batch_shape(obj):
     return [_replace_batch_shape(x) for x in obj]
   return obj
 
-def patch_h5_batch_shape(in_path):
+def patch_h5_batch_shape(in_path, cache_dir="/app/model_cache"):
   """
   Creates a patched copy of an H5 model where InputLayer config key
   'batch_shape' is replaced with 'batch_input_shape'.
   Returns the patched path (or original if no patch needed).
   """
   # `connect4.py` patch function output path
-  os.makedirs("/app/model_cache", exist_ok=True)
+  os.makedirs(cache_dir, exist_ok=True)
   base = os.path.basename(in_path).replace(".h5", "_patched.h5")
-  out_path = os.path.join("/app/model_cache", base)
+  out_path = os.path.join(cache_dir, base)
 
   if os.path.exists(out_path):
     return out_path
 
+  import h5py
   with h5py.File(in_path, "r") as f:
     if "model_config" not in f.attrs:
       return in_path
@@ -58,65 +60,97 @@ def patch_h5_batch_shape(in_path):
   return out_path
 
 
-##################################### Define Game Logic #####################################
-
-def find_legal(board):
-    """Find legal moves"""
-    legal = [i for i in range(7) if abs(board[0,i]) < 0.1]
-    return legal
-
 ##################################### Player Types Class ###################################
 
-class PatchedBatchNormalization(tf.keras.layers.BatchNormalization):
-    def __init__(self, *args, **kwargs):
-        # Older TF/Keras doesn't know this arg
-        kwargs.pop("synchronized", None)
-        super().__init__(*args, **kwargs)
+def _legacy_keras():
+    import keras as _keras
+    return _keras.__version__.startswith("2.")
 
-class CNNPlayer:
-    """Your CNN model player"""
+def _patched_batch_normalization():
+    import tensorflow as tf
 
-    def __init__(self, model_path):
-        print(f"Loading CNN model from {model_path}...")
+    class PatchedBatchNormalization(tf.keras.layers.BatchNormalization):
+        def __init__(self, *args, **kwargs):
+            # Older TF/Keras doesn't know this arg
+            kwargs.pop("synchronized", None)
+            super().__init__(*args, **kwargs)
 
-        # Ensure we don't use mixed precision when loading/running inference
-        tf.keras.mixed_precision.set_global_policy("float32")
+    return PatchedBatchNormalization
 
-        patched_path = patch_h5_batch_shape(model_path)
+# keras/function/xla load the H5 model; tflite expects a converted .tflite file
+PREDICT_MODES = ("keras", "function", "xla", "tflite")
+# XLA compiles once per input shape, so in xla mode batches are zero-padded to
+# one of these sizes (larger ones run in chunks of the biggest), all compiled at load
+XLA_BATCH_SIZES = env_batch_sizes("XLA_BATCH_SIZES")
 
-        self.model = keras.models.load_model(
-            patched_path,
-            compile=False,
-            custom_objects={
-                "DTypePolicy": tf.keras.mixed_precision.Policy,
-                "BatchNormalization": PatchedBatchNormalization
-            }
-        )
+class CNNPlayer(PolicyPlayer):
+    """Your CNN model player"""
 
+    label = "CNN"
+
+    def __init__(self, model_path, predict_mode="function"):
+        if predict_mode not in PREDICT_MODES:
+            raise ValueError(f"predict_mode must be one of {PREDICT_MODES}, got {predict_mode!r}")
+
+        print(f"Loading CNN model from {model_path} (predict mode: {predict_mode})...")
+
+        self.predict_mode = predict_mode
+
+        if predict_mode == "tflite":
+            from tflite_backend import TFLitePredictor
+            self.model = None
+            self._forward = TFLitePredictor(model_path)
+        else:
+            with phase("cnn.imports"):
+                import tensorflow as tf
+                from tensorflow import keras
+
+            # Ensure we don't use mixed precision when loading/running inference
+            tf.keras.mixed_precision.set_global_policy("float32")
+
+            # Keras 3 reads the H5 config as saved; tf.keras 2.x needs it patched
+            with phase("cnn.h5_patch"):
+                patched_path = patch_h5_batch_shape(model_path) if _legacy_keras() else model_path
+
+            with phase("cnn.model_load"):
+                self.model = keras.models.load_model(
+                    patched_path,
+                    compile=False,
+                    custom_objects={
+                        "DTypePolicy": tf.keras.mixed_precision.Policy,
+                        "BatchNormalization": _patched_batch_normalization()
+                    }
+                )
+
+            if predict_mode == "keras":
+                self._forward = lambda batch: self.model.predict(batch, verbose=0)
+            elif predict_mode == "xla":
+                with phase("cnn.trace"):
+                    compiled = self._compile(jit=True)
+                    for n in XLA_BATCH_SIZES:
+                        compiled(tf.zeros((n, 6, 7, 2), dtype=tf.float32))
+                self._forward = lambda batch: run_padded(lambda x: compiled(x).numpy(), batch, XLA_BATCH_SIZES)
+            else:
+                with phase("cnn.trace"):
+                    compiled = self._compile()
+                self._forward = lambda batch: compiled(tf.convert_to_tensor(batch, dtype=tf.float32)).numpy()
+
+        super().__init__()
 
         print("✓ CNN loaded!")
 
-    def board_to_input(self, board, player='plus'):
-        """Convert board to CNN input format"""
-        if player == 'minus':
-            board = -board
+    def _compile(self, jit=False):
+        """Trace the model once into a graph with a fixed (None,6,7,2) signature"""
+        import tensorflow as tf
+        model = self.model
 
-        board_input = np.zeros((1, 6, 7, 2), dtype=np.float32)
-        board_input[0, :, :, 0] = (board == 1).astype(np.float32)
-        board_input[0, :, :, 1] = (board == -1).astype(np.float32)
-
-        return board_input
-
-    def get_move(self, board, color='plus'):
-        """Get CNN's recommended move"""
-        legal = find_legal(board)
-        if len(legal) == 0:
-            return None
-
-        board_input = self.board_to_input(board, color)
-        predictions = self.model.predict(board_input, verbose=0)[0]
-
-        masked_predictions = np.full(7, -np.inf)
-        masked_predictions[legal] = predictions[legal]
+        @tf.function(
+            input_signature=[tf.TensorSpec(shape=(None, 6, 7, 2), dtype=tf.float32)],
+            jit_compile=jit,
+        )
+        def forward(x):
+            return model(x, training=False)
 
-        return int(np.argmax(masked_predictions))
\ No newline at end of file
+        # Force the trace now so the first move doesn't pay for it
+        forward.get_concrete_function()
+        return forward
@@ -0,0 +1,59 @@
+"""
+Convert the served models to TensorFlow Lite.
+
+  python convert_tflite.py --out /app/model_cache
+
+writes CNN_v2_deep_best.tflite and tx_model.tflite; copy them into
+`models/` and start the servers with INFERENCE_BACKEND=tflite. Dockerfile.tflite
+builds a slim image that serves them without TensorFlow.
+"""
+import argparse
+import os
+
+import tensorflow as tf
+
+MODEL_DIR = os.getenv("MODEL_DIR", "/models")
+CNN_PATH = os.path.join(MODEL_DIR, "CNN_v2_deep_best.h5")
+TX_DIR = os.path.join(MODEL_DIR, "tx_savedmodel")
+
+CNN_TFLITE = "CNN_v2_deep_best.tflite"
+TX_TFLITE = "tx_model.tflite"
+
+def load_cnn_keras(path=CNN_PATH):
+  from connect4 import CNNPlayer
+  return CNNPlayer(path, predict_mode="keras").model
+
+def cnn_converter(path=CNN_PATH):
+  return tf.lite.TFLiteConverter.from_keras_model(load_cnn_keras(path))
+
+def tx_converter(path=TX_DIR):
+  return tf.lite.TFLiteConverter.from_saved_model(path)
+
+def convert(converter, out_path):
+  """Convert with builtin ops only, falling back to Select TF ops if the graph needs them."""
+  try:
+    flat = converter.convert()
+  except Exception as e:
+    print(f"Builtin-only conversion failed ({e}); retrying with Select TF ops")
+    converter.target_spec.supported_ops = [
+      tf.lite.OpsSet.TFLITE_BUILTINS,
+      tf.lite.OpsSet.SELECT_TF_OPS,
+    ]
+    flat = converter.convert()
+
+  with open(out_path, "wb") as f:
+    f.write(flat)
+  print(f"✓ Wrote {out_path} ({len(flat) / 1024:.0f} KiB)")
+  return out_path
+
+def main():
+  parser = argparse.ArgumentParser(description="Convert the CNN and Transformer to .tflite")
+  parser.add_argument("--out", default="/app/model_cache")
+  args = parser.parse_args()
+
+  os.makedirs(args.out, exist_ok=True)
+  convert(cnn_converter(), os.path.join(args.out, CNN_TFLITE))
+  convert(tx_converter(), os.path.join(args.out, TX_TFLITE))
+
+if __name__ == "__main__":
+  main()
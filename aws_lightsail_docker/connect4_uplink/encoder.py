@@ -0,0 +1,91 @@
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+
+SIDES = {'plus': 1, 'minus': -1, 1: 1, -1: -1}
+
+def side_sign(side):
+  """'plus'/'minus' or +1/-1 -> +1/-1; anything else is a ValueError"""
+  try:
+    return SIDES[side]
+  except (KeyError, TypeError):
+    raise ValueError(f"side must be 'plus', 'minus', 1 or -1, got {side!r}") from None
+
+class BoardEncoder:
+  """
+  Encodes 6x7 boards (+1 / -1 / 0) into (N,6,7,2) float32 model input in one
+  vectorized pass.
+
+  Side to move is handled here and nowhere else:
+    relative=True   channel 0 = stones of the side to move, channel 1 = opponent
+                    (the CNN's training convention)
+    relative=False  the board as seen with the side to move playing -1:
+                    channel 0 = opponent, channel 1 = side to move
+                    (the Transformer's training convention)
+
+  `encoding()` borrows a buffer from a pool shared by all threads;
+  `encode()` returns a fresh array for callers that keep the input.
+  """
+
+  def __init__(self, relative=True, capacity=64):
+    self.relative = relative
+    self.capacity = capacity
+    self._free = []  # idle (buf, own, opp) sets
+    self._lock = threading.Lock()
+
+  def _checkout(self, n):
+    with self._lock:
+      for i, bufs in enumerate(self._free):
+        if len(bufs[0]) >= n:
+          return self._free.pop(i)
+    return self._allocate(max(n, self.capacity))
+
+  def _release(self, bufs):
+    with self._lock:
+      self._free.append(bufs)
+
+  @staticmethod
+  def _allocate(size):
+    return (np.empty((size, 6, 7, 2), dtype=np.float32),
+            np.empty((size, 1, 1), dtype=np.float32),
+            np.empty((size, 1, 1), dtype=np.float32))
+
+  def _encode_into(self, bufs, boards, players):
+    n = len(boards)
+    x, own, opp = bufs[0][:n], bufs[1][:n], bufs[2][:n]
+
+    # Sign of the stones that go in channel 0
+    first = 1.0 if self.relative else -1.0
+    if isinstance(players, (str, int, float)):
+      own.fill(first * side_sign(players))
+    else:
+      own[:, 0, 0] = [first * side_sign(p) for p in players]
+
+    np.negative(own, out=opp)
+    np.equal(boards, own, out=x[..., 0])
+    np.equal(boards, opp, out=x[..., 1])
+    return x
+
+  @contextmanager
+  def encoding(self, boards, players='plus'):
+    """
+    (N,6,7) boards -> (N,6,7,2) view into a pooled buffer, valid inside the
+    `with` block only. `players` is one side for every board or a sequence
+    of N sides ('plus'/'minus' or +1/-1).
+    """
+    boards = np.asarray(boards, dtype=np.float32)
+    bufs = self._checkout(len(boards))
+    try:
+      yield self._encode_into(bufs, boards, players)
+    finally:
+      self._release(bufs)
+
+  def encode(self, boards, players='plus'):
+    """(N,6,7) boards -> new (N,6,7,2) array the caller owns"""
+    boards = np.asarray(boards, dtype=np.float32)
+    return self._encode_into(self._allocate(len(boards)), boards, players)
+
+  def encode_one(self, board, player='plus'):
+    """Single board -> new (1,6,7,2) array"""
+    return self.encode(np.asarray(board, dtype=np.float32)[None], player)
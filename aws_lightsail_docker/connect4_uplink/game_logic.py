@@ -0,0 +1,188 @@
+import time
+
+import numpy as np
+
+from bitboard import Position
+from encoder import BoardEncoder, side_sign
+
+# Game logic and move selection with no model runtime dependency; importing
+# this module never pulls in TensorFlow, Keras or h5py.
+
+##################################### Define Game Logic #####################################
+
+def find_legal(board):
+    """Find legal moves"""
+    legal = [i for i in range(7) if abs(board[0,i]) < 0.1]
+    return legal
+
+def legal_mask(boards):
+    """(N,7) bool mask of non-full columns for an (N,6,7) stack"""
+    return np.abs(np.asarray(boards)[:, 0, :]) < 0.1
+
+def board_error(board):
+    """
+    Why a 6x7 board can't come from a real game (bad shape or values,
+    floating stones, impossible stone counts), or None if it's fine.
+    """
+    board = np.asarray(board)
+    if board.shape != (6, 7):
+        return f"board must be 6x7, got shape {board.shape}"
+    if not np.isin(board, (-1, 0, 1)).all():
+        return "board cells must be -1, 0 or 1"
+    filled = board != 0
+    # Row 0 is the top: a stone needs a stone (or the floor) directly below it
+    if (filled[:-1] & ~filled[1:]).any():
+        return "board has a floating stone"
+    diff = int((board == 1).sum()) - int((board == -1).sum())
+    if diff not in (0, 1):
+        return f"impossible stone counts (+1 minus -1 = {diff})"
+    return None
+
+def forced_move(board, color):
+    """
+    (col, "win") if `color` can connect four right now, (col, "block") if
+    the opponent threatens to, else None. Checked on bitboards, no model.
+    """
+    piece = side_sign(color)
+    pos = Position.from_board(board)
+    legal = pos.legal_moves()
+    for col in legal:
+        if pos.is_winning_move(col, piece):
+            return col, "win"
+    for col in legal:
+        if pos.is_winning_move(col, -piece):
+            return col, "block"
+    return None
+
+def best_legal_columns(scores, legal):
+    """Masked argmax per row; -1 where a board has no legal move"""
+    masked = np.where(legal, scores, -np.inf)
+    cols = np.argmax(masked, axis=1)
+    cols[~legal.any(axis=1)] = -1
+    return cols
+
+##################################### Player Types Class ###################################
+
+class NullMetrics:
+    """Metrics sink that records nothing; the model registry swaps in metrics.METRICS"""
+
+    def inc(self, name, model, n=1):
+        pass
+
+    def observe(self, stage, model, seconds):
+        pass
+
+NULL_METRICS = NullMetrics()
+
+class PolicyPlayer:
+    """Shared move selection for models that score the 7 columns of a board"""
+
+    label = "Model"
+    # True: the model sees the side to move in channel 0 (see BoardEncoder)
+    relative_encoding = True
+
+    def __init__(self):
+        self.encoder = BoardEncoder(relative=self.relative_encoding)
+        # Model label on metrics; the model registry sets it to its key
+        self.name = self.label
+        # (N,6,7,2) -> (N,7); the model registry may swap in a MicroBatcher
+        self.predictor = self.predict_batch
+        # Optional PositionCache consulted before the model
+        self.cache = None
+        # Stage timings and counters; injected so this module doesn't import metrics
+        self.metrics = NULL_METRICS
+
+    def board_to_input(self, board, player='plus'):
+        """Single board -> new (1,6,7,2) model input"""
+        return self.encoder.encode_one(board, player)
+
+    def boards_to_input(self, boards, players):
+        """(N,6,7) boards -> new (N,6,7,2) model input"""
+        return self.encoder.encode(boards, players)
+
+    def encoded(self, boards, players):
+        """`with` block yielding the (N,6,7,2) input in a pooled buffer (no allocation per call)"""
+        return self.encoder.encoding(boards, players)
+
+    def predict_batch(self, batch):
+        """Raw move scores for an (N,6,7,2) batch; subclasses set `_forward` to their runtime's call"""
+        return self._forward(batch)
+
+    def get_moves(self, boards, colors, return_policy=False, label=None):
+        """
+        Best legal column for each of an (N,6,7) stack of boards in one forward
+        pass (None where a board is full), plus the raw (N,7) scores if asked.
+        Metrics go under `label` (default "<name>_batch"), apart from single moves.
+        """
+        label = label or f"{self.name}_batch"
+        boards = np.asarray(boards, dtype=np.float32)
+        if isinstance(colors, (str, int)):
+            colors = [colors] * len(boards)
+
+        cols = [None] * len(boards)
+        todo = []
+        for i, (board, color) in enumerate(zip(boards, colors)):
+            forced = forced_move(board, color)
+            if forced is None:
+                todo.append(i)
+            else:
+                cols[i] = forced[0]
+                self.metrics.inc(f"tactical_{forced[1]}s", label)
+
+        # Forced boards skip the model unless the caller wants every policy row
+        idx = list(range(len(boards))) if return_policy else todo
+        scores = np.zeros((0, 7), dtype=np.float32)
+        if idx:
+            t0 = time.perf_counter()
+            with self.encoded(boards[idx], [colors[i] for i in idx]) as x:
+                t1 = time.perf_counter()
+                scores = np.asarray(self.predict_batch(x))
+                t2 = time.perf_counter()
+            best = best_legal_columns(scores, legal_mask(boards[idx]))
+            for i, c in zip(idx, best):
+                if cols[i] is None and c >= 0:
+                    cols[i] = int(c)
+            t3 = time.perf_counter()
+
+            self.metrics.observe("encode", label, t1 - t0)
+            self.metrics.observe("forward", label, t2 - t1)
+            self.metrics.observe("masking", label, t3 - t2)
+        if return_policy:
+            return cols, scores
+        return cols
+
+    def get_move(self, board, color='plus', tactics=True):
+        """
+        Get the model's recommended move. Immediate wins and must-blocks are
+        played without the model unless `tactics` is False (the caller has
+        already checked).
+        """
+        legal = find_legal(board)
+        if len(legal) == 0:
+            return None
+
+        if tactics:
+            forced = forced_move(board, color)
+            if forced is not None:
+                self.metrics.inc(f"tactical_{forced[1]}s", self.name)
+                return forced[0]
+
+        if self.cache is not None:
+            return self.cache.get_or_compute(board, color, lambda: self._predict_move(board, color, legal))
+        return self._predict_move(board, color, legal)
+
+    def _predict_move(self, board, color, legal):
+        t0 = time.perf_counter()
+        with self.encoded(np.asarray(board, dtype=np.float32)[None], color) as board_input:
+            t1 = time.perf_counter()
+            # Queue wait and forward time are recorded by the micro-batcher
+            predictions = np.asarray(self.predictor(board_input))[0]
+            t2 = time.perf_counter()
+
+        masked_predictions = np.full(7, -np.inf)
+        masked_predictions[legal] = predictions[legal]
+        col = int(np.argmax(masked_predictions))
+
+        self.metrics.observe("encode", self.name, t1 - t0)
+        self.metrics.observe("masking", self.name, time.perf_counter() - t2)
+        return col
@@ -0,0 +1,119 @@
+import atexit
+import json
+import os
+import queue
+import random
+import sys
+import threading
+import time
+
+# debug < info < warning < error; events below LOG_LEVEL are discarded on the caller's thread
+LEVELS = {"debug": 10, "info": 20, "warning": 30, "error": 40}
+LOG_LEVEL = os.getenv("LOG_LEVEL", "info").lower()
+# Fraction of sampled events (per-move lines) that are kept
+LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", "1.0"))
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+
+class StructuredLogger:
+  """
+  JSON-lines logger that never blocks the request thread.
+
+  `log()` builds a dict and puts it on a bounded queue; a daemon thread
+  serialises and writes the lines. When the queue is full (stdout is
+  stalled) the event is dropped and counted, and the writer reports the
+  number dropped as a `log_dropped` event once it catches up.
+  """
+
+  def __init__(self, stream=None, level=LOG_LEVEL, sample_rate=LOG_SAMPLE_RATE,
+               maxsize=LOG_QUEUE_SIZE):
+    self.stream = stream
+    self.level = LEVELS.get(level, LEVELS["info"])
+    self.sample_rate = sample_rate
+    self._queue = queue.Queue(maxsize=maxsize)
+    self._lock = threading.Lock()
+    self.dropped = 0
+    self.sampled_out = 0
+    self._reported_dropped = 0
+
+    self._writer = threading.Thread(target=self._run, name="jsonlog", daemon=True)
+    self._writer.start()
+    atexit.register(self.flush)
+
+  # ---------------- CALLER SIDE ----------------
+
+  def log(self, level, event, sample=False, **fields):
+    """
+    Queue one event. `sample=True` marks high-volume events that are kept
+    with probability `sample_rate`.
+    """
+    if LEVELS.get(level, 0) < self.level:
+      return
+    if sample and self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+      with self._lock:
+        self.sampled_out += 1
+      return
+
+    record = {"ts": round(time.time(), 3), "level": level, "event": event}
+    record.update(fields)
+    try:
+      self._queue.put_nowait(record)
+    except queue.Full:
+      with self._lock:
+        self.dropped += 1
+
+  def debug(self, event, **fields):
+    self.log("debug", event, **fields)
+
+  def info(self, event, **fields):
+    self.log("info", event, **fields)
+
+  def warning(self, event, **fields):
+    self.log("warning", event, **fields)
+
+  def error(self, event, **fields):
+    self.log("error", event, **fields)
+
+  def stats(self):
+    with self._lock:
+      return {"queued": self._queue.qsize(), "dropped": self.dropped, "sampled_out": self.sampled_out}
+
+  # ---------------- WRITER SIDE ----------------
+
+  def _run(self):
+    while True:
+      lines = [self._format(self._queue.get())]
+      # Drain whatever else is waiting so one write/flush covers the burst
+      while True:
+        try:
+          lines.append(self._format(self._queue.get_nowait()))
+        except queue.Empty:
+          break
+
+      with self._lock:
+        dropped = self.dropped - self._reported_dropped
+        self._reported_dropped = self.dropped
+      if dropped:
+        lines.append(self._format({"ts": round(time.time(), 3), "level": "warning",
+                                   "event": "log_dropped", "count": dropped}))
+
+      stream = self.stream or sys.stdout
+      try:
+        stream.write("".join(lines))
+        stream.flush()
+      except (OSError, ValueError):
+        pass
+      finally:
+        for _ in range(len(lines) - (1 if dropped else 0)):
+          self._queue.task_done()
+
+  @staticmethod
+  def _format(record):
+    return json.dumps(record, default=str, ensure_ascii=False) + "\n"
+
+  def flush(self, timeout=2.0):
+    """Wait (up to `timeout` s) for queued events to be written; used at exit."""
+    deadline = time.monotonic() + timeout
+    while self._queue.unfinished_tasks and time.monotonic() < deadline:
+      time.sleep(0.01)
+
+LOG = StructuredLogger()
@@ -0,0 +1,196 @@
+"""
+Local stand-in for the Anvil uplink, for offline load tests.
+
+  python local_gateway.py --port 8765
+
+Loads and warms the same models as `uplink_server.py`, then serves every
+`@uplink_callable` function over plain HTTP/JSON instead of the Anvil
+websocket (no ANVIL_UPLINK_KEY needed):
+
+  POST /call/<name>   body {"args": [...], "kwargs": {...}}
+                      -> 200 {"result": ...}
+                      -> 404 / 400 / 500 {"error": "...", "type": "..."}
+  GET  /callables     -> {"callables": [names]}
+  GET  /healthz       -> {"ok": true, "models": [...]}
+  GET  /metrics       -> Prometheus text (see metrics.py)
+
+Connections are HTTP/1.1 keep-alive and each one is handled on its own
+thread, so concurrent clients exercise the micro-batcher and caches the way
+concurrent Anvil sessions do. `GatewayClient` is a small keep-alive client
+for load-test scripts.
+"""
+import argparse
+import http.client
+import json
+import sys
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+def _to_json(obj):
+  # numpy scalars / arrays that slip through a callable's return value
+  if isinstance(obj, np.generic):
+    return obj.item()
+  if isinstance(obj, np.ndarray):
+    return obj.tolist()
+  raise TypeError(f"{type(obj).__name__} is not JSON serializable")
+
+##################################### Server #####################################
+
+class GatewayHandler(BaseHTTPRequestHandler):
+  protocol_version = "HTTP/1.1"  # keep-alive
+  callables = {}
+  models = []
+  quiet = True
+
+  def _send(self, status, payload):
+    body = json.dumps(payload, default=_to_json).encode("utf-8")
+    self.send_response(status)
+    self.send_header("Content-Type", "application/json")
+    self.send_header("Content-Length", str(len(body)))
+    self.end_headers()
+    self.wfile.write(body)
+
+  def do_GET(self):
+    if self.path == "/healthz":
+      self._send(200, {"ok": True, "models": self.models})
+    elif self.path == "/metrics":
+      import metrics
+      metrics.write_response(self)
+    elif self.path == "/callables":
+      self._send(200, {"callables": sorted(self.callables)})
+    else:
+      self._send(404, {"error": f"no route {self.path}", "type": "NotFound"})
+
+  def do_POST(self):
+    # Always drain the body so the connection stays usable for the next request
+    length = int(self.headers.get("Content-Length") or 0)
+    raw = self.rfile.read(length) if length else b""
+
+    if not self.path.startswith("/call/"):
+      return self._send(404, {"error": f"no route {self.path}", "type": "NotFound"})
+    name = self.path[len("/call/"):]
+    fn = self.callables.get(name)
+    if fn is None:
+      return self._send(404, {"error": f"no callable {name!r}", "type": "NotFound"})
+
+    try:
+      req = json.loads(raw) if raw else {}
+      args, kwargs = req.get("args", []), req.get("kwargs", {})
+      if not isinstance(args, list) or not isinstance(kwargs, dict):
+        raise ValueError("'args' must be a list and 'kwargs' an object")
+    except ValueError as e:
+      return self._send(400, {"error": str(e), "type": "BadRequest"})
+
+    try:
+      result = fn(*args, **kwargs)
+    except Exception as e:
+      return self._send(500, {"error": str(e), "type": type(e).__name__})
+    self._send(200, {"result": result})
+
+  def log_message(self, fmt, *args):
+    if not self.quiet:
+      super().log_message(fmt, *args)
+
+def serve(host="127.0.0.1", port=8765, quiet=True):
+  """Load/warm the models, then serve the uplink callables until interrupted."""
+  import metrics
+  import uplink_server
+  from callable_registry import CALLABLES
+
+  uplink_server.prepare_models()
+  # /metrics is served on the gateway port; only the summary line runs separately
+  metrics.start(port=0)
+
+  GatewayHandler.callables = dict(CALLABLES)
+  GatewayHandler.models = list(uplink_server.MODELS)
+  GatewayHandler.quiet = quiet
+
+  server = ThreadingHTTPServer((host, port), GatewayHandler)
+  server.daemon_threads = True
+  print(f"✅ Local gateway on http://{host}:{server.server_port} "
+        f"({', '.join(sorted(CALLABLES))})")
+  try:
+    server.serve_forever()
+  except KeyboardInterrupt:
+    pass
+  finally:
+    server.server_close()
+
+##################################### Client #####################################
+
+class GatewayError(RuntimeError):
+  """A callable raised (or the request was rejected) on the gateway side."""
+
+class GatewayClient:
+  """
+  Keep-alive client: one persistent HTTP connection, reconnected on failure.
+  Not thread-safe; give each load-test worker its own client.
+  """
+
+  def __init__(self, host="127.0.0.1", port=8765, timeout=30.0):
+    self.host, self.port, self.timeout = host, port, timeout
+    self._conn = None
+
+  def _connection(self):
+    if self._conn is None:
+      self._conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+    return self._conn
+
+  def _request(self, method, path, payload=None):
+    body = json.dumps(payload, default=_to_json).encode("utf-8") if payload is not None else None
+    headers = {"Content-Type": "application/json"} if body is not None else {}
+    for attempt in range(2):
+      conn = self._connection()
+      try:
+        conn.request(method, path, body=body, headers=headers)
+        resp = conn.getresponse()
+        return resp.status, json.loads(resp.read())
+      except (http.client.HTTPException, ConnectionError):
+        # Server closed an idle keep-alive connection; retry once on a fresh one
+        self.close()
+        if attempt:
+          raise
+
+  def call(self, name, *args, **kwargs):
+    """Same shape as `anvil.server.call(name, *args, **kwargs)`."""
+    status, payload = self._request("POST", f"/call/{name}", {"args": list(args), "kwargs": kwargs})
+    if status != 200:
+      raise GatewayError(f"{payload.get('type')}: {payload.get('error')}")
+    return payload["result"]
+
+  def health(self):
+    return self._request("GET", "/healthz")[1]
+
+  def close(self):
+    if self._conn is not None:
+      self._conn.close()
+      self._conn = None
+
+def wait_until_ready(host="127.0.0.1", port=8765, timeout=300.0):
+  """Poll /healthz until the gateway answers (model loading can take a while)."""
+  deadline = time.monotonic() + timeout
+  client = GatewayClient(host, port, timeout=5.0)
+  while True:
+    try:
+      return client.health()
+    except OSError:
+      if time.monotonic() > deadline:
+        raise
+      time.sleep(0.5)
+    finally:
+      client.close()
+
+##################################### Main #####################################
+
+def main():
+  parser = argparse.ArgumentParser(description="Serve the uplink callables over local HTTP/JSON")
+  parser.add_argument("--host", default="127.0.0.1")
+  parser.add_argument("--port", type=int, default=8765)
+  parser.add_argument("--access-log", action="store_true", help="log every request to stderr")
+  args = parser.parse_args()
+  serve(args.host, args.port, quiet=not args.access_log)
+
+if __name__ == "__main__":
+  sys.exit(main())
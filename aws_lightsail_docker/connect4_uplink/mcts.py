@@ -0,0 +1,210 @@
+"""
+Monte Carlo Tree Search (PUCT) with a policy model as the prior.
+
+Leaves are collected across several simulations at once: each descent
+adds a virtual loss along its path so the next one is steered elsewhere,
+then all collected leaves are scored in a single forward pass (MCTS_BATCH
+boards, 16-64 works well) and backed up together. The policy models have
+no value head, so a leaf is valued by the static line evaluation from
+`search.py` squashed into [-1, 1]; wins and draws are scored exactly.
+"""
+import math
+import os
+import time
+
+import numpy as np
+
+from bitboard import Position
+from search import evaluate
+
+MCTS_TIME_MS = float(os.getenv("MCTS_TIME_MS", "1000"))
+# Upper bound on a caller-supplied time_ms (the tree grows with it)
+MCTS_MAX_MS = float(os.getenv("MCTS_MAX_MS", "3000"))
+MCTS_BATCH = min(64, max(16, int(os.getenv("MCTS_BATCH", "32"))))
+MCTS_C_PUCT = float(os.getenv("MCTS_C_PUCT", "1.5"))
+
+VIRTUAL_LOSS = 1.0
+VALUE_SCALE = 100.0   # evaluate() units per tanh unit
+
+class Node:
+  """
+  Tree node. N / W count visits and total value from the point of view of
+  the player who moved into this node; P holds the children's priors once
+  the node has been evaluated.
+  """
+
+  __slots__ = ("pos", "parent", "col", "children", "P", "N", "W", "terminal", "pending")
+
+  def __init__(self, pos, parent=None, col=None, terminal=None):
+    self.pos = pos
+    self.parent = parent
+    self.col = col
+    self.children = {}
+    self.P = None
+    self.N = 0.0
+    self.W = 0.0
+    # Value for the player who moved here if the game is over (1 = won, 0 = draw)
+    self.terminal = terminal
+    self.pending = False
+
+def _priors(scores, legal):
+  """Normalised prior over legal columns from raw model output (probabilities or logits)."""
+  scores = np.asarray(scores, dtype=np.float64)
+  if scores.min() < 0 or abs(scores.sum() - 1.0) > 1e-3:
+    scores = np.exp(scores - scores.max())
+  p = np.zeros(7)
+  p[legal] = scores[legal]
+  total = p.sum()
+  if total <= 0:
+    p[legal] = 1.0
+    total = len(legal)
+  return p / total
+
+def _leaf_value(pos):
+  """Value in [-1, 1] for the side to move at a non-terminal leaf."""
+  for col in pos.legal_moves():
+    if pos.is_winning_move(col):
+      return 1.0
+  return math.tanh(evaluate(pos) / VALUE_SCALE)
+
+class MCTS:
+  """One search from one position; create one per request."""
+
+  def __init__(self, player, batch_size=MCTS_BATCH, c_puct=MCTS_C_PUCT):
+    self.player = player
+    self.batch_size = batch_size
+    self.c_puct = c_puct
+    self.sims = 0
+    self.batches = 0
+    self.evaluated = 0
+
+  # ---------------- TREE ----------------
+
+  def _child(self, node, col):
+    child = node.children.get(col)
+    if child is None:
+      pos = node.pos.copy()
+      won = pos.is_winning_move(col)
+      pos.drop(col)
+      terminal = 1.0 if won else 0.0 if pos.is_full() else None
+      child = node.children[col] = Node(pos, node, col, terminal)
+    return child
+
+  def _select(self, node):
+    """Best child by PUCT (Q + U); unvisited children fall back to their prior."""
+    sqrt_n = math.sqrt(max(node.N, 1.0))
+    best, best_score = None, -math.inf
+    for col in node.pos.legal_moves():
+      child = node.children.get(col)
+      n, w = (child.N, child.W) if child is not None else (0.0, 0.0)
+      q = w / n if n else 0.0
+      score = q + self.c_puct * node.P[col] * sqrt_n / (1.0 + n)
+      if score > best_score:
+        best, best_score = col, score
+    return self._child(node, best)
+
+  def _descend(self, root):
+    """Walk to a leaf, adding virtual loss on the way; returns the path."""
+    node = root
+    path = [node]
+    while node.terminal is None and node.P is not None:
+      node = self._select(node)
+      path.append(node)
+    for n in path:
+      n.N += VIRTUAL_LOSS
+      n.W -= VIRTUAL_LOSS
+    return path
+
+  def _backup(self, path, value):
+    """`value` is from the point of view of the player who moved into the leaf."""
+    for node in reversed(path):
+      node.N += 1.0 - VIRTUAL_LOSS
+      node.W += value + VIRTUAL_LOSS
+      value = -value
+
+  def _revert(self, path):
+    """Take back the virtual loss of a descent that won't be backed up."""
+    for node in path:
+      node.N -= VIRTUAL_LOSS
+      node.W += VIRTUAL_LOSS
+
+  # ---------------- EVALUATION ----------------
+
+  def _evaluate(self, leaves):
+    """Priors for every leaf in one forward pass."""
+    boards = np.stack([leaf.pos.to_array() for leaf in leaves])
+    with self.player.encoded(boards, [leaf.pos.side_to_move for leaf in leaves]) as x:
+      scores = np.asarray(self.player.predict_batch(x))
+    self.batches += 1
+    self.evaluated += len(leaves)
+    for leaf, row in zip(leaves, scores):
+      leaf.P = _priors(row, leaf.pos.legal_moves())
+
+  def _run_batch(self, root):
+    leaves, paths = [], []
+    for _ in range(self.batch_size):
+      path = self._descend(root)
+      leaf = path[-1]
+      if leaf.terminal is not None:
+        self._backup(path, leaf.terminal)
+        self.sims += 1
+      elif leaf.pending:
+        # Virtual loss couldn't steer away from a leaf already queued; evaluate what we have
+        self._revert(path)
+        break
+      else:
+        leaf.pending = True
+        leaves.append(leaf)
+        paths.append(path)
+
+    if leaves:
+      self._evaluate(leaves)
+      for leaf, path in zip(leaves, paths):
+        leaf.pending = False
+        # _leaf_value is for the side to move at the leaf; flip to the mover's view
+        self._backup(path, -_leaf_value(leaf.pos))
+        self.sims += 1
+
+  # ---------------- API ----------------
+
+  def search(self, board, time_ms=MCTS_TIME_MS):
+    """
+    Best column for the side to move on a 6x7 board. Returns a dict with
+    col, visits (per column), value (root side's expected result in
+    [-1, 1]), sims, sims_per_s, batches, avg_batch and ms.
+    """
+    t0 = time.perf_counter()
+    pos = Position.from_board(board)
+    legal = pos.legal_moves()
+    if not legal:
+      return {"col": None, "visits": [0] * 7, "value": 0.0, "sims": 0,
+              "sims_per_s": 0, "batches": 0, "avg_batch": 0.0, "ms": 0.0}
+
+    for col in legal:
+      if pos.is_winning_move(col):
+        visits = [0] * 7
+        visits[col] = 1
+        return {"col": col, "visits": visits, "value": 1.0, "sims": 0, "sims_per_s": 0,
+                "batches": 0, "avg_batch": 0.0, "ms": round(1000 * (time.perf_counter() - t0), 2)}
+
+    root = Node(pos)
+    self._evaluate([root])
+    deadline = t0 + time_ms / 1000.0
+    while time.perf_counter() < deadline:
+      self._run_batch(root)
+
+    visits = [int(root.children[c].N) if c in root.children else 0 for c in range(7)]
+    col = max(legal, key=lambda c: (visits[c], root.P[c]))
+    child = root.children.get(col)
+    elapsed = time.perf_counter() - t0
+    return {
+      "col": int(col),
+      "visits": visits,
+      "value": round(child.W / child.N, 4) if child is not None and child.N else 0.0,
+      "sims": self.sims,
+      "sims_per_s": int(self.sims / elapsed) if elapsed > 0 else 0,
+      "batches": self.batches,
+      # leaves per forward pass, not counting the root's
+      "avg_batch": round((self.evaluated - 1) / max(self.batches - 1, 1), 2),
+      "ms": round(1000 * elapsed, 2),
+    }
@@ -0,0 +1,176 @@
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from jsonlog import LOG
+
+# Prometheus text endpoint (0 disables it) and the periodic summary log line
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9100"))
+METRICS_HOST = os.getenv("METRICS_HOST", "0.0.0.0")
+METRICS_REPORT_SECS = float(os.getenv("METRICS_REPORT_SECS", "60"))
+
+# Latency bucket upper bounds in seconds (100 µs .. 2.5 s)
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+           0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+# Stages in request order; the summary line prints them in this order
+STAGES = ("decode", "encode", "queue_wait", "forward", "masking", "total", "total_batch", "ponder")
+
+class Histogram:
+  """Fixed-bucket latency histogram (cumulative on export, Prometheus-style)."""
+
+  __slots__ = ("counts", "sum", "count")
+
+  def __init__(self):
+    self.counts = [0] * (len(BUCKETS) + 1)  # last slot is +Inf
+    self.sum = 0.0
+    self.count = 0
+
+  def observe(self, seconds):
+    self.counts[bisect_left(BUCKETS, seconds)] += 1
+    self.sum += seconds
+    self.count += 1
+
+  def quantile(self, q):
+    """Upper bound of the bucket holding quantile `q` (None if empty)."""
+    if not self.count:
+      return None
+    rank = q * self.count
+    seen = 0
+    for i, c in enumerate(self.counts):
+      seen += c
+      if seen >= rank:
+        return BUCKETS[i] if i < len(BUCKETS) else float("inf")
+    return float("inf")
+
+class Metrics:
+  """
+  Per-model stage histograms and counters shared by the whole process.
+
+    METRICS.observe("forward", "cnn", seconds)
+    METRICS.inc("calls", "cnn")
+    with METRICS.timer("decode", "cnn"): ...
+
+  Exported as Prometheus text by `render()` and summarised by `summary()`.
+  """
+
+  def __init__(self, namespace="connect4"):
+    self.namespace = namespace
+    self._hists = {}
+    self._counters = {}
+    self._lock = threading.Lock()
+    self.started = time.time()
+
+  # ---------------- RECORDING ----------------
+
+  def observe(self, stage, model, seconds):
+    with self._lock:
+      hist = self._hists.get((stage, model))
+      if hist is None:
+        hist = self._hists[(stage, model)] = Histogram()
+      hist.observe(seconds)
+
+  def inc(self, name, model, n=1):
+    with self._lock:
+      key = (name, model)
+      self._counters[key] = self._counters.get(key, 0) + n
+
+  @contextmanager
+  def timer(self, stage, model):
+    t0 = time.perf_counter()
+    try:
+      yield
+    finally:
+      self.observe(stage, model, time.perf_counter() - t0)
+
+  # ---------------- EXPORT ----------------
+
+  def render(self):
+    """Everything in the Prometheus text exposition format."""
+    ns = self.namespace
+    with self._lock:
+      hists = sorted(self._hists.items())
+      counters = sorted(self._counters.items())
+
+    lines = [f"# HELP {ns}_stage_seconds Latency per request stage.",
+             f"# TYPE {ns}_stage_seconds histogram"]
+    for (stage, model), h in hists:
+      labels = f'stage="{stage}",model="{model}"'
+      cumulative = 0
+      for bound, c in zip(BUCKETS + ("+Inf",), h.counts):
+        cumulative += c
+        lines.append(f'{ns}_stage_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+      lines.append(f"{ns}_stage_seconds_sum{{{labels}}} {h.sum:.6f}")
+      lines.append(f"{ns}_stage_seconds_count{{{labels}}} {h.count}")
+
+    declared = set()
+    for (name, model), value in counters:
+      metric = f"{ns}_{name}_total"
+      if metric not in declared:
+        declared.add(metric)
+        lines.append(f"# TYPE {metric} counter")
+      lines.append(f'{metric}{{model="{model}"}} {value}')
+
+    lines.append(f"# TYPE {ns}_uptime_seconds gauge")
+    lines.append(f"{ns}_uptime_seconds {time.time() - self.started:.0f}")
+    return "\n".join(lines) + "\n"
+
+  def summary(self):
+    """One line per model: counters, then count / p50 / p95 (ms) per stage."""
+    with self._lock:
+      hists = dict(self._hists)
+      counters = dict(self._counters)
+
+    models = sorted({m for _, m in hists} | {m for _, m in counters})
+    parts = []
+    for model in models:
+      fields = [f"{name}={v}" for (name, m), v in sorted(counters.items()) if m == model]
+      for stage in STAGES:
+        h = hists.get((stage, model))
+        if h is None or not h.count:
+          continue
+        fields.append(f"{stage}[n={h.count} p50={1000 * h.quantile(0.5):.2f} "
+                      f"p95={1000 * h.quantile(0.95):.2f}ms]")
+      parts.append(f"{model}: " + " ".join(fields))
+    return " | ".join(parts) or "no requests yet"
+
+METRICS = Metrics()
+
+##################################### Endpoint #####################################
+
+def write_response(handler):
+  """Answer a GET on `handler` (any BaseHTTPRequestHandler) with the Prometheus text page."""
+  body = METRICS.render().encode("utf-8")
+  handler.send_response(200)
+  handler.send_header("Content-Type", "text/plain; version=0.0.4")
+  handler.send_header("Content-Length", str(len(body)))
+  handler.end_headers()
+  handler.wfile.write(body)
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+  def do_GET(self):
+    if self.path != "/metrics":
+      self.send_error(404)
+      return
+    write_response(self)
+
+  def log_message(self, fmt, *args):
+    pass
+
+def _report_forever(interval):
+  while True:
+    time.sleep(interval)
+    LOG.info("metrics_summary", summary=METRICS.summary())
+
+def start(port=METRICS_PORT, host=METRICS_HOST, report_secs=METRICS_REPORT_SECS):
+  """Serve /metrics on a daemon thread and start the periodic summary line."""
+  if port:
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    print(f"✓ Metrics on http://{host}:{server.server_port}/metrics")
+  if report_secs:
+    threading.Thread(target=_report_forever, args=(report_secs,), name="metrics-report", daemon=True).start()
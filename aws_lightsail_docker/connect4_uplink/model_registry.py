@@ -0,0 +1,61 @@
+import threading
+
+from batching import MicroBatcher
+from metrics import METRICS
+from position_cache import PositionCache
+
+class ModelRegistry:
+  """
+  Named policy models hosted by one uplink process. Each model is built
+  by its factory on first use (or by `load`), then wrapped with its own
+  micro-batcher and position cache.
+  """
+
+  def __init__(self):
+    self._factories = {}
+    self._labels = {}
+    self._aliases = {}
+    self._models = {}
+    self._lock = threading.Lock()
+
+  def register(self, name, factory, label=None, aliases=()):
+    """`factory()` must return a PolicyPlayer-like object."""
+    self._factories[name] = factory
+    self._labels[name] = label or name
+    for alias in (name,) + tuple(aliases):
+      self._aliases[alias.lower()] = name
+
+  def resolve(self, name):
+    """Registry key for a name or alias (case-insensitive)."""
+    key = self._aliases.get(str(name).lower())
+    if key is None:
+      raise ValueError(f"Unknown model {name!r}; available: {sorted(self._factories)}")
+    return key
+
+  def names(self):
+    return list(self._factories)
+
+  def label(self, name):
+    return self._labels[self.resolve(name)]
+
+  def is_loaded(self, name):
+    return self.resolve(name) in self._models
+
+  def get(self, name):
+    """Loaded model for `name`, building it on first use."""
+    key = self.resolve(name)
+    model = self._models.get(key)
+    if model is not None:
+      return model
+
+    with self._lock:
+      if key not in self._models:
+        model = self._factories[key]()
+        model.name = key
+        model.metrics = METRICS
+        # Concurrent calls share one batched forward pass
+        model.predictor = MicroBatcher(model.predict_batch, name=key)
+        # Repeated (and mirrored) positions skip the model entirely
+        model.cache = PositionCache(name=key)
+        self._models[key] = model
+      return self._models[key]
@@ -0,0 +1,150 @@
+"""
+Precomputed opening table for the CNN and Transformer bots.
+
+Build (offline, inside the uplink image so both models load):
+
+  python opening_book.py --depth 7 --out /app/model_cache/opening_table.npy
+
+then copy the file into `models/` (or point OPENING_TABLE at it). At serve
+time the table is memory-mapped and searched with a binary search, so the
+early plies never touch TensorFlow.
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+
+from bitboard import Position
+from game_logic import best_legal_columns, legal_mask
+from position_cache import canonical_key
+
+MODEL_DIR = os.getenv("MODEL_DIR", "/models")
+CNN_PATH = os.path.join(MODEL_DIR, "CNN_v2_deep_best.h5")
+TX_DIR = os.path.join(MODEL_DIR, "tx_savedmodel")
+OPENING_TABLE = os.getenv("OPENING_TABLE", os.path.join(MODEL_DIR, "opening_table.npy"))
+
+# 10 bytes per position: canonical key + best column for each model
+TABLE_DTYPE = np.dtype([("key", "<u8"), ("cnn", "u1"), ("tx", "u1")])
+
+NO_MOVE = 255
+
+##################################### Lookup #####################################
+
+class OpeningTable:
+  """Sorted, memory-mapped (key -> column) table for positions with the bot (-1) to move."""
+
+  def __init__(self, table):
+    self.table = table
+    self.keys = table["key"]
+    self.hits = 0
+    self.misses = 0
+
+  @classmethod
+  def load(cls, path=OPENING_TABLE):
+    """Memory-map the table, or return None if it hasn't been built."""
+    if not path or not os.path.exists(path):
+      return None
+    table = np.load(path, mmap_mode="r")
+    print(f"✓ Opening table mapped from {path} ({len(table)} positions)")
+    return cls(table)
+
+  def lookup(self, board, model):
+    """Best column for `model` ("cnn" or "tx"), or None if the position isn't in the table."""
+    if model not in self.table.dtype.names:
+      return None
+    key, mirrored = canonical_key(board, "minus")
+    i = int(np.searchsorted(self.keys, key))
+    if i >= len(self.keys) or int(self.keys[i]) != key:
+      self.misses += 1
+      return None
+    col = int(self.table[model][i])
+    if col == NO_MOVE:
+      self.misses += 1
+      return None
+    self.hits += 1
+    return 6 - col if mirrored else col
+
+##################################### Build #####################################
+
+def enumerate_positions(depth):
+  """
+  Canonical boards with the bot (-1, second player) to move, reachable in
+  at most `depth` plies and not already decided. Returns (keys, boards).
+  """
+  found = {}
+  frontier = {0: Position()}
+  for ply in range(depth + 1):
+    if ply % 2 == 1:
+      for pos in frontier.values():
+        board = pos.to_board()
+        key, mirrored = canonical_key(board, "minus")
+        if key not in found:
+          found[key] = pos.mirror().to_board() if mirrored else board
+    if ply == depth:
+      break
+
+    nxt = {}
+    for pos in frontier.values():
+      for col in pos.legal_moves():
+        child = pos.copy()
+        won = child.is_winning_move(col)
+        child.drop(col)
+        if won or child.is_full():
+          continue
+        nxt.setdefault(child.key(), child)
+    frontier = nxt
+
+  keys = np.array(sorted(found), dtype=np.uint64)
+  boards = np.array([found[int(k)] for k in keys], dtype=np.float32)
+  return keys, boards
+
+def best_columns(boards, scores):
+  """Masked argmax over legal columns for every board (NO_MOVE if full)."""
+  cols = best_legal_columns(scores, legal_mask(boards))
+  return np.where(cols < 0, NO_MOVE, cols).astype(np.uint8)
+
+
+# The players are built directly: importing uplink_server would register callables and start its threads
+def score_cnn(boards, batch_size):
+  from connect4 import CNNPlayer
+  return score(CNNPlayer(CNN_PATH), boards, batch_size)
+
+def score_tx(boards, batch_size):
+  from transformer import TransformerPlayer
+  return score(TransformerPlayer(TX_DIR), boards, batch_size)
+
+def score(player, boards, batch_size):
+  """Best column for every board, scored in batches with the bot (-1) to move."""
+  out = []
+  for i in range(0, len(boards), batch_size):
+    x = player.boards_to_input(boards[i:i + batch_size], "minus")
+    out.append(np.array(player.predict_batch(x)))
+  return best_columns(boards, np.concatenate(out, axis=0))
+
+def build(depth, out_path, batch_size=1024):
+  t0 = time.perf_counter()
+  keys, boards = enumerate_positions(depth)
+  print(f"Enumerated {len(keys)} canonical positions up to depth {depth} "
+        f"in {time.perf_counter() - t0:.1f}s")
+
+  table = np.zeros(len(keys), dtype=TABLE_DTYPE)
+  table["key"] = keys
+  table["cnn"] = score_cnn(boards, batch_size)
+  table["tx"] = score_tx(boards, batch_size)
+
+  os.makedirs(os.path.dirname(os.path.abspath(out_path)), exist_ok=True)
+  np.save(out_path, table)
+  print(f"✓ Wrote {out_path} ({os.path.getsize(out_path) / 1024:.0f} KiB) "
+        f"in {time.perf_counter() - t0:.1f}s")
+
+def main():
+  parser = argparse.ArgumentParser(description="Build the Connect4 opening table")
+  parser.add_argument("--depth", type=int, default=7, help="max plies from the empty board")
+  parser.add_argument("--out", default="/app/model_cache/opening_table.npy")
+  parser.add_argument("--batch-size", type=int, default=1024)
+  args = parser.parse_args()
+  build(args.depth, args.out, args.batch_size)
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,115 @@
+import os
+import queue
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+
+from bitboard import MINUS, PLUS, Position
+from jsonlog import LOG
+from metrics import METRICS
+
+PONDER = os.getenv("PONDER", "1") == "1"
+# Skip pondering while more than this many foreground requests are running
+PONDER_MAX_INFLIGHT = int(os.getenv("PONDER_MAX_INFLIGHT", "4"))
+PONDER_QUEUE = int(os.getenv("PONDER_QUEUE", "64"))
+
+def reply_boards(board, bot_col):
+  """
+  Boards after the bot plays `bot_col` and the human answers in each legal
+  column, skipping lines that end the game. Returns (human_cols, (N,6,7) boards).
+  """
+  pos = Position.from_board(board)
+  if pos.is_winning_move(bot_col, MINUS):
+    return [], None
+  pos.drop(bot_col, MINUS)
+  cols, boards = [], []
+  for col in pos.legal_moves():
+    if pos.is_winning_move(col, PLUS):
+      continue
+    pos.drop(col, PLUS)
+    if not pos.is_full():
+      cols.append(col)
+      boards.append(pos.to_array())
+    pos.undo(col)
+  return cols, np.stack(boards) if boards else None
+
+class _Job:
+  __slots__ = ("player", "name", "human_cols", "boards", "on_result", "cancel")
+
+  def __init__(self, player, name, human_cols, boards, on_result, cancel):
+    self.player = player
+    self.name = name
+    self.human_cols = human_cols
+    self.boards = boards
+    self.on_result = on_result
+    self.cancel = cancel
+
+class Ponderer:
+  """
+  Works out the bot's answer to every possible human reply while the human
+  is thinking: one batched forward pass of up to 7 boards per job, on a
+  single background thread.
+
+  Foreground requests run inside `foreground()`. Jobs are refused (or
+  dropped before they run) while more than `max_inflight` of those are
+  active, and a job whose `cancel` event is set is skipped.
+  """
+
+  def __init__(self, enabled=PONDER, max_inflight=PONDER_MAX_INFLIGHT, maxsize=PONDER_QUEUE):
+    self.enabled = enabled
+    self.max_inflight = max_inflight
+    self._queue = queue.Queue(maxsize=maxsize)
+    self._inflight = 0
+    self._lock = threading.Lock()
+    if enabled:
+      threading.Thread(target=self._run, name="ponder", daemon=True).start()
+
+  @contextmanager
+  def foreground(self):
+    with self._lock:
+      self._inflight += 1
+    try:
+      yield
+    finally:
+      with self._lock:
+        self._inflight -= 1
+
+  def busy(self):
+    return self._inflight > self.max_inflight
+
+  def submit(self, player, name, board, bot_col, on_result, cancel=None):
+    """
+    Queue a job for the position after the bot's `bot_col`.
+    `on_result(human_cols, boards, bot_cols)` runs on the ponder thread.
+    Returns False if the job was refused.
+    """
+    if not self.enabled or bot_col is None:
+      return False
+    if self.busy():
+      METRICS.inc("ponder_skipped", name)
+      return False
+    human_cols, boards = reply_boards(board, int(bot_col))
+    if not human_cols:
+      return False
+    try:
+      self._queue.put_nowait(_Job(player, name, human_cols, boards, on_result, cancel))
+    except queue.Full:
+      METRICS.inc("ponder_skipped", name)
+      return False
+    return True
+
+  def _run(self):
+    while True:
+      job = self._queue.get()
+      if (job.cancel is not None and job.cancel.is_set()) or self.busy():
+        METRICS.inc("ponder_cancelled", job.name)
+        continue
+      try:
+        # get_moves answers forced positions without the model and the rest in one pass
+        with METRICS.timer("ponder", job.name):
+          cols = job.player.get_moves(job.boards, "minus", label=f"{job.name}_ponder")
+        job.on_result(job.human_cols, job.boards, cols)
+        METRICS.inc("ponder_runs", job.name)
+      except Exception as e:
+        LOG.warning("ponder_failed", model=job.name, error=f"{type(e).__name__}: {e}")
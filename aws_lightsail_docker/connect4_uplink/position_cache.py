@@ -0,0 +1,100 @@
+import os
+import threading
+from collections import OrderedDict
+
+from bitboard import BOTTOM_MASK, COLS, Position
+from encoder import side_sign
+from metrics import METRICS
+
+CACHE_SIZE = int(os.getenv("POSITION_CACHE_SIZE", "50000"))
+
+SIDE_BIT = 1 << 49  # keys from Position use bits 0..48
+
+def _side_bit(side):
+  return SIDE_BIT if side_sign(side) < 0 else 0
+
+def canonical_key(board, side):
+  """
+  Canonical cache key for (board, side to move) plus whether the board had
+  to be mirrored to reach it. A board and its left-right reflection share
+  one key.
+  """
+  pos = Position.from_board(board)
+  mirrored = pos.mirror()
+  k = pos.plus + pos.mask + BOTTOM_MASK
+  mk = mirrored.plus + mirrored.mask + BOTTOM_MASK
+  if mk < k:
+    return mk | _side_bit(side), True
+  return k | _side_bit(side), False
+
+class PositionCache:
+  """
+  Bounded LRU of best columns keyed by `canonical_key`. Columns are stored
+  in canonical orientation and flipped back on mirrored lookups.
+  """
+
+  def __init__(self, maxsize=CACHE_SIZE, name="model"):
+    self.maxsize = maxsize
+    self.name = name
+    self._data = OrderedDict()
+    self._lock = threading.Lock()
+    self.hits = 0
+    self.mirrored_hits = 0
+    self.misses = 0
+    self.evictions = 0
+
+  def get(self, board, side):
+    """Cached column for this board, or None on a miss."""
+    key, mirrored = canonical_key(board, side)
+    return self._lookup(key, mirrored)
+
+  def put(self, board, side, col):
+    key, mirrored = canonical_key(board, side)
+    self._store(key, mirrored, col)
+
+  def get_or_compute(self, board, side, compute):
+    """Return the cached column, or call `compute()` and cache its result."""
+    key, mirrored = canonical_key(board, side)
+    col = self._lookup(key, mirrored)
+    if col is None:
+      col = compute()
+      if col is not None:
+        self._store(key, mirrored, col)
+    return col
+
+  # ---------------- INTERNALS ----------------
+
+  def _lookup(self, key, mirrored):
+    with self._lock:
+      col = self._data.get(key)
+      if col is None:
+        self.misses += 1
+        METRICS.inc("cache_misses", self.name)
+        return None
+      self._data.move_to_end(key)
+      self.hits += 1
+      if mirrored:
+        self.mirrored_hits += 1
+    METRICS.inc("cache_hits", self.name)
+    return COLS - 1 - col if mirrored else col
+
+  def _store(self, key, mirrored, col):
+    col = int(col)
+    with self._lock:
+      self._data[key] = COLS - 1 - col if mirrored else col
+      self._data.move_to_end(key)
+      while len(self._data) > self.maxsize:
+        self._data.popitem(last=False)
+        self.evictions += 1
+
+  def stats(self):
+    with self._lock:
+      lookups = self.hits + self.misses
+      return {
+        "size": len(self._data),
+        "hits": self.hits,
+        "mirrored_hits": self.mirrored_hits,
+        "misses": self.misses,
+        "evictions": self.evictions,
+        "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+      }
@@ -0,0 +1,163 @@
+"""
+Post-training int8 quantization for the CNN and Transformer.
+
+  python quantize.py --out /app/model_cache [--boards games.npy]
+
+For each model this writes a dynamic-range (`*_dynamic.tflite`) and a
+full-integer (`*_int8.tflite`) file, then reports top-1 move agreement
+with the float32 model, per-move latency and file size to
+`quantization_report.json`. Point CNN_TFLITE_PATH / TX_TFLITE_PATH at a
+quantized file and run with INFERENCE_BACKEND=tflite to serve it.
+
+Calibration boards come from `--boards` (an (N,6,7) array of real game
+positions) when given, otherwise from seeded random self-play.
+"""
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+import tensorflow as tf
+
+import convert_tflite
+from bitboard import random_positions
+from opening_book import best_columns
+from tflite_backend import TFLitePredictor
+
+MODES = ("float", "dynamic", "int8")
+
+##################################### Boards #####################################
+
+def load_boards(path, n_calibration, n_eval):
+  """
+  Disjoint (N,6,7) calibration and evaluation boards, from a saved array
+  of real game positions or from seeded random self-play.
+  """
+  if path:
+    boards = np.load(path).astype(np.float32)
+    boards = boards[np.random.default_rng(0).permutation(len(boards))]
+    return boards[:n_calibration], boards[n_calibration:n_calibration + n_eval]
+  positions = random_positions(n_calibration + n_eval, seed=0, min_moves=1, max_moves=35)
+  boards = np.stack([pos.to_array() for pos in positions])
+  return boards[:n_calibration], boards[n_calibration:]
+
+##################################### Models #####################################
+
+class _ModelSpec:
+  """How to build a converter, encode boards and run the float32 reference for one model"""
+
+  def __init__(self, name, converter_fn, encode_fn, reference_fn):
+    self.name = name
+    self.converter_fn = converter_fn
+    self.encode_fn = encode_fn
+    self.reference_fn = reference_fn
+
+def _cnn_spec():
+  from connect4 import CNNPlayer
+  player = CNNPlayer(convert_tflite.CNN_PATH, predict_mode="function")
+  return _ModelSpec(
+    "cnn",
+    lambda: tf.lite.TFLiteConverter.from_keras_model(player.model),
+    lambda boards: player.boards_to_input(boards, "minus").copy(),
+    player.predict_batch,
+  )
+
+def _tx_spec():
+  from transformer import TransformerPlayer
+  player = TransformerPlayer(convert_tflite.TX_DIR)
+  return _ModelSpec(
+    "tx",
+    convert_tflite.tx_converter,
+    lambda boards: player.boards_to_input(boards, "minus").copy(),
+    player.predict_batch,
+  )
+
+##################################### Quantize #####################################
+
+def quantized_converter(spec, mode, calibration):
+  converter = spec.converter_fn()
+  if mode == "float":
+    return converter
+
+  converter.optimizations = [tf.lite.Optimize.DEFAULT]
+  if mode == "int8":
+    def representative_dataset():
+      for x in calibration:
+        yield [x[None].astype(np.float32)]
+    converter.representative_dataset = representative_dataset
+    converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+    converter.inference_input_type = tf.int8
+    converter.inference_output_type = tf.int8
+  return converter
+
+def _latency_ms(predict_fn, inputs, repeats=200):
+  """Median single-board latency."""
+  times = []
+  for i in range(repeats):
+    x = inputs[i % len(inputs)][None]
+    t0 = time.perf_counter()
+    predict_fn(x)
+    times.append(time.perf_counter() - t0)
+  return round(1000.0 * float(np.median(times)), 4)
+
+def evaluate(spec, out_dir, calibration_boards, eval_boards):
+  calibration = spec.encode_fn(calibration_boards)
+  eval_inputs = spec.encode_fn(eval_boards)
+  reference = best_columns(eval_boards, np.asarray(spec.reference_fn(eval_inputs)))
+
+  rows = [{
+    "variant": "float32 (reference)",
+    "path": None,
+    "size_kib": None,
+    "top1_agreement": 1.0,
+    "latency_ms": _latency_ms(spec.reference_fn, eval_inputs),
+  }]
+
+  for mode in MODES:
+    path = os.path.join(out_dir, f"{spec.name}_{mode}.tflite")
+    try:
+      convert_tflite.convert(quantized_converter(spec, mode, calibration), path)
+    except Exception as e:
+      print(f"⚠️ {spec.name} {mode} conversion failed: {e}")
+      rows.append({"variant": mode, "path": path, "error": str(e)})
+      continue
+
+    predictor = TFLitePredictor(path)
+    cols = best_columns(eval_boards, predictor(eval_inputs))
+    rows.append({
+      "variant": mode,
+      "path": path,
+      "size_kib": round(os.path.getsize(path) / 1024, 1),
+      "top1_agreement": round(float(np.mean(cols == reference)), 4),
+      "latency_ms": _latency_ms(predictor, eval_inputs),
+    })
+  return rows
+
+def main():
+  parser = argparse.ArgumentParser(description="Quantize the CNN and Transformer to int8")
+  parser.add_argument("--out", default="/app/model_cache")
+  parser.add_argument("--boards", default=None, help="optional .npy of (N,6,7) boards from real games")
+  parser.add_argument("--calibration", type=int, default=500)
+  parser.add_argument("--eval", type=int, default=2000)
+  parser.add_argument("--models", default="cnn,tx")
+  args = parser.parse_args()
+
+  os.makedirs(args.out, exist_ok=True)
+  calibration_boards, eval_boards = load_boards(args.boards, args.calibration, args.eval)
+
+  specs = {"cnn": _cnn_spec, "tx": _tx_spec}
+  report = {}
+  for name in args.models.split(","):
+    report[name] = evaluate(specs[name](), args.out, calibration_boards, eval_boards)
+    for row in report[name]:
+      print(f"{name:>4} {row['variant']:<20} agree={row.get('top1_agreement')} "
+            f"latency_ms={row.get('latency_ms')} size_kib={row.get('size_kib')}")
+
+  report_path = os.path.join(args.out, "quantization_report.json")
+  with open(report_path, "w") as f:
+    json.dump(report, f, indent=2)
+  print(f"✓ Wrote {report_path}")
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,229 @@
+"""
+Iterative-deepening alpha-beta search on the bitboard `Position`.
+
+Negamax with a Zobrist-hashed transposition table and a wall-clock budget.
+A policy model (the CNN by default) orders the moves at the root and its
+children; all of those positions are scored in one batched forward pass
+before the search starts. Deeper nodes use the transposition-table move
+and a centre-first order, with a static evaluation over every four-cell
+line at the horizon.
+"""
+import os
+import random
+import time
+
+import numpy as np
+
+from bitboard import COLS, H1, MINUS, PLUS, ROWS, Position
+
+SEARCH_TIME_MS = float(os.getenv("SEARCH_TIME_MS", "500"))
+# Upper bound on a caller-supplied time_ms
+SEARCH_MAX_MS = float(os.getenv("SEARCH_MAX_MS", "2000"))
+# Entries kept before the transposition table is cleared
+SEARCH_TT_SIZE = int(os.getenv("SEARCH_TT_SIZE", "1000000"))
+
+WIN_SCORE = 100000           # minus the move count, so faster wins score higher
+INF = 10 * WIN_SCORE
+CENTRE_ORDER = (3, 2, 4, 1, 5, 0, 6)
+
+EXACT, LOWER, UPPER = 0, 1, 2
+
+##################################### Zobrist / Evaluation #####################################
+
+_rng = random.Random(0x5EED)
+# One 64-bit key per (colour, bit index); bit indices follow the bitboard layout
+ZOBRIST = {
+  PLUS: [_rng.getrandbits(64) for _ in range(COLS * H1)],
+  MINUS: [_rng.getrandbits(64) for _ in range(COLS * H1)],
+}
+
+def zobrist_hash(pos):
+  h = 0
+  for piece, bb in ((PLUS, pos.plus), (MINUS, pos.minus)):
+    while bb:
+      low = bb & -bb
+      h ^= ZOBRIST[piece][low.bit_length() - 1]
+      bb ^= low
+  return h
+
+def _windows():
+  """Bit masks of every four-cell line on the board (69 of them)."""
+  def bit(col, h):
+    return 1 << (col * H1 + h)
+  out = []
+  for c in range(COLS):
+    for h in range(ROWS):
+      for dc, dh in ((0, 1), (1, 0), (1, 1), (1, -1)):
+        cells = [(c + i * dc, h + i * dh) for i in range(4)]
+        if all(0 <= cc < COLS and 0 <= hh < ROWS for cc, hh in cells):
+          out.append(sum(bit(cc, hh) for cc, hh in cells))
+  return tuple(out)
+
+WINDOWS = _windows()
+WINDOW_WEIGHTS = (0, 1, 8, 64, 0)   # by own stones in an otherwise empty line
+CENTRE_COLUMN = ((1 << ROWS) - 1) << (3 * H1)
+
+def evaluate(pos):
+  """Static score for the side to move: open lines weighted by stones, plus centre control."""
+  own = pos.stones(pos.side_to_move)
+  opp = pos.mask ^ own
+  score = 0
+  for w in WINDOWS:
+    o = own & w
+    p = opp & w
+    if o and p:
+      continue
+    if o:
+      score += WINDOW_WEIGHTS[bin(o).count("1")]
+    elif p:
+      score -= WINDOW_WEIGHTS[bin(p).count("1")]
+  score += 3 * (bin(own & CENTRE_COLUMN).count("1") - bin(opp & CENTRE_COLUMN).count("1"))
+  return score
+
+##################################### Search #####################################
+
+class _Timeout(Exception):
+  pass
+
+class AlphaBetaSearch:
+  """
+  One search from one position; not thread-safe, create one per request.
+  `player` is a PolicyPlayer used for move ordering (None = centre-first only).
+  """
+
+  def __init__(self, player=None, tt_size=SEARCH_TT_SIZE):
+    self.player = player
+    self.tt = {}
+    self.tt_size = tt_size
+    self.policy = {}
+    self.nodes = 0
+
+  def _prefetch_policy(self, pos, h):
+    """Policy scores for the root and each child, in one forward pass."""
+    positions, hashes = [pos], [h]
+    for col in pos.legal_moves():
+      child = pos.copy()
+      bit_index = child.heights[col]
+      piece = child.side_to_move
+      child.drop(col)
+      if child.has_won(piece) or child.is_full():
+        continue
+      positions.append(child)
+      hashes.append(h ^ ZOBRIST[piece][bit_index])
+
+    boards = np.stack([p.to_array() for p in positions])
+    with self.player.encoded(boards, [p.side_to_move for p in positions]) as x:
+      scores = np.asarray(self.player.predictor(x))
+    for key, row in zip(hashes, scores):
+      self.policy[key] = row
+
+  def _order(self, moves, h, tt_move):
+    scores = self.policy.get(h)
+    if scores is not None:
+      moves = sorted(moves, key=lambda c: -scores[c])
+    else:
+      moves = [c for c in CENTRE_ORDER if c in moves]
+    if tt_move is not None and tt_move in moves:
+      moves.remove(tt_move)
+      moves.insert(0, tt_move)
+    return moves
+
+  def _negamax(self, pos, h, depth, alpha, beta):
+    self.nodes += 1
+    if not self.nodes & 1023 and time.perf_counter() > self.deadline:
+      raise _Timeout
+
+    moves = pos.legal_moves()
+    if not moves:
+      return 0
+    for col in moves:
+      if pos.is_winning_move(col):
+        return WIN_SCORE - (pos.moves + 1)
+    if depth == 0:
+      return evaluate(pos)
+
+    alpha_orig = alpha
+    tt_move = None
+    entry = self.tt.get(h)
+    if entry is not None:
+      e_depth, flag, e_score, tt_move = entry
+      if e_depth >= depth:
+        if flag == EXACT:
+          return e_score
+        if flag == LOWER:
+          alpha = max(alpha, e_score)
+        else:
+          beta = min(beta, e_score)
+        if alpha >= beta:
+          return e_score
+
+    piece = pos.side_to_move
+    zob = ZOBRIST[piece]
+    best, best_move = -INF, moves[0]
+    for col in self._order(moves, h, tt_move):
+      bit_index = pos.heights[col]
+      pos.drop(col, piece)
+      score = -self._negamax(pos, h ^ zob[bit_index], depth - 1, -beta, -alpha)
+      pos.undo(col)
+      if score > best:
+        best, best_move = score, col
+      if score > alpha:
+        alpha = score
+      if alpha >= beta:
+        break
+
+    flag = UPPER if best <= alpha_orig else LOWER if best >= beta else EXACT
+    if len(self.tt) >= self.tt_size:
+      self.tt.clear()
+    self.tt[h] = (depth, flag, best, best_move)
+    return best
+
+  def search(self, board, time_ms=SEARCH_TIME_MS, max_depth=None):
+    """
+    Best column for the side to move on a 6x7 board. Returns a dict with
+    col, score, depth (last fully searched), nodes, nps, ms and policy_ms
+    (the time spent on the batched policy pass).
+    """
+    t0 = time.perf_counter()
+    pos = Position.from_board(board)
+    legal = pos.legal_moves()
+    if not legal:
+      return {"col": None, "score": 0, "depth": 0, "nodes": 0, "nps": 0, "ms": 0.0, "policy_ms": 0.0}
+
+    for col in legal:
+      if pos.is_winning_move(col):
+        return {"col": col, "score": WIN_SCORE - (pos.moves + 1), "depth": 1, "nodes": 1,
+                "nps": 0, "ms": round(1000 * (time.perf_counter() - t0), 2), "policy_ms": 0.0}
+
+    h = zobrist_hash(pos)
+    if self.player is not None:
+      self._prefetch_policy(pos, h)
+    policy_ms = 1000 * (time.perf_counter() - t0)
+
+    self.deadline = t0 + time_ms / 1000.0
+    max_depth = min(max_depth or ROWS * COLS, ROWS * COLS - pos.moves)
+    best_col, best_score, depth_done = self._order(legal, h, None)[0], 0, 0
+
+    for depth in range(1, max_depth + 1):
+      try:
+        score = self._negamax(pos, h, depth, -INF, INF)
+      except _Timeout:
+        # `pos` is left mid-line; it's discarded with this search
+        break
+      best_col = self.tt[h][3]
+      best_score, depth_done = score, depth
+      if abs(score) >= WIN_SCORE - ROWS * COLS:
+        break  # forced result found; deeper search can't change it
+      if time.perf_counter() > self.deadline:
+        break
+
+    elapsed = time.perf_counter() - t0
+    return {
+      "col": int(best_col),
+      "score": int(best_score),
+      "depth": depth_done,
+      "nodes": self.nodes,
+      "nps": int(self.nodes / elapsed) if elapsed > 0 else 0,
+      "ms": round(1000 * elapsed, 2),
+      "policy_ms": round(policy_ms, 2),
+    }
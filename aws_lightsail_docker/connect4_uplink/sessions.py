@@ -0,0 +1,110 @@
+import os
+import threading
+import time
+import uuid
+
+from bitboard import MINUS, PLUS, Position
+
+SESSION_TTL_SECS = float(os.getenv("SESSION_TTL_SECS", "1800"))
+SESSION_MAX = int(os.getenv("SESSION_MAX", "10000"))
+
+class GameSession:
+  """
+  One game against the bot. The board lives here as a bitboard Position, so
+  clients only send the human's column. Hold `lock` while reading or
+  changing the position.
+  """
+
+  __slots__ = ("id", "model", "pos", "history", "winner", "created", "last_seen", "lock",
+               "ponder", "ponder_cancel")
+
+  def __init__(self, model):
+    self.id = uuid.uuid4().hex
+    self.model = model
+    self.pos = Position()
+    self.history = []
+    self.winner = None
+    self.created = self.last_seen = time.monotonic()
+    self.lock = threading.Lock()
+    # Pondered replies: (ply they apply at, {human column: bot column})
+    self.ponder = None
+    self.ponder_cancel = threading.Event()
+
+  @property
+  def over(self):
+    return self.winner is not None or self.pos.is_full()
+
+  def play(self, col, piece):
+    """Apply a move after checking it against the stored board."""
+    if self.over:
+      raise ValueError("Game is already over")
+    if self.pos.side_to_move != piece:
+      raise ValueError("Out of turn: it is not " + ("the human's" if piece == PLUS else "the bot's") + " move")
+    if not isinstance(col, int) or not 0 <= col < 7 or not self.pos.can_play(col):
+      raise ValueError(f"Illegal move: column {col!r} is not playable")
+    if self.pos.is_winning_move(col, piece):
+      self.winner = piece
+    self.pos.drop(col, piece)
+    self.history.append(col)
+
+  def replay(self, moves):
+    """Replace the game with `moves` (every column from the first move on), checked move by move."""
+    fresh = GameSession(self.model)
+    for i, col in enumerate(moves):
+      fresh.play(col, PLUS if i % 2 == 0 else MINUS)
+    self.pos, self.history, self.winner = fresh.pos, fresh.history, fresh.winner
+    self.ponder = None
+
+  def to_board(self):
+    return self.pos.to_board()
+
+class SessionStore:
+  """Sessions by id; idle ones expire after `ttl` seconds, the oldest go first when full."""
+
+  def __init__(self, ttl=SESSION_TTL_SECS, max_sessions=SESSION_MAX):
+    self.ttl = ttl
+    self.max_sessions = max_sessions
+    self._sessions = {}
+    self._lock = threading.Lock()
+    self.created = 0
+    self.expired = 0
+
+  def create(self, model):
+    session = GameSession(model)
+    with self._lock:
+      self._sweep(session.created)
+      if len(self._sessions) >= self.max_sessions:
+        oldest = min(self._sessions.values(), key=lambda s: s.last_seen)
+        del self._sessions[oldest.id]
+        self.expired += 1
+      self._sessions[session.id] = session
+      self.created += 1
+    return session
+
+  def get(self, session_id):
+    """Live session for `session_id`; raises ValueError if unknown or expired."""
+    now = time.monotonic()
+    with self._lock:
+      session = self._sessions.get(session_id)
+      if session is not None and now - session.last_seen > self.ttl:
+        del self._sessions[session_id]
+        self.expired += 1
+        session = None
+    if session is None:
+      raise ValueError(f"Unknown or expired game session {session_id!r}")
+    session.last_seen = now
+    return session
+
+  def end(self, session_id):
+    with self._lock:
+      return self._sessions.pop(session_id, None) is not None
+
+  def _sweep(self, now):
+    stale = [sid for sid, s in self._sessions.items() if now - s.last_seen > self.ttl]
+    for sid in stale:
+      del self._sessions[sid]
+    self.expired += len(stale)
+
+  def stats(self):
+    with self._lock:
+      return {"active": len(self._sessions), "created": self.created, "expired": self.expired}
@@ -0,0 +1,39 @@
+import json
+import os
+import time
+from contextlib import contextmanager
+
+STARTUP_PROFILE = os.getenv("STARTUP_PROFILE", "")
+
+class StartupProfiler:
+  """Wall-clock duration of each named startup phase, in the order they finish"""
+
+  def __init__(self):
+    self.started = time.perf_counter()
+    self.phases = []
+
+  @contextmanager
+  def phase(self, name):
+    t0 = time.perf_counter()
+    try:
+      yield
+    finally:
+      self.phases.append((name, 1000.0 * (time.perf_counter() - t0)))
+
+  def record(self, name, ms):
+    self.phases.append((name, ms))
+
+  def report(self, path=STARTUP_PROFILE):
+    """Log one summary line and optionally write the profile as JSON."""
+    total = 1000.0 * (time.perf_counter() - self.started)
+    summary = ", ".join(f"{name} {ms:.0f} ms" for name, ms in self.phases)
+    print(f"⏱ Startup profile ({total:.0f} ms total): {summary}")
+    if path:
+      with open(path, "w") as f:
+        json.dump({"total_ms": round(total, 1),
+                   "phases": [{"phase": n, "ms": round(ms, 1)} for n, ms in self.phases]}, f, indent=2)
+    return self.phases
+
+# Process-wide profiler; model loaders record their own phases into it
+PROFILER = StartupProfiler()
+phase = PROFILER.phase
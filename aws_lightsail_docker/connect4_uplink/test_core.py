@@ -0,0 +1,137 @@
+import random
+
+import numpy as np
+import pytest
+
+from bitboard import COLS, MINUS, PLUS, ROWS, Position, random_positions
+from encoder import BoardEncoder
+from game_logic import board_error, forced_move
+from position_cache import PositionCache, canonical_key
+
+def board_from(rows):
+  """6 strings, top row first: 'x' = +1, 'o' = -1, '.' = empty."""
+  return np.array([[{"x": 1, "o": -1, ".": 0}[ch] for ch in row] for row in rows], dtype=np.float32)
+
+def has_four_scan(board, piece):
+  """Brute-force four-in-a-row check over every cell and direction."""
+  for r in range(ROWS):
+    for c in range(COLS):
+      for dr, dc in ((0, 1), (1, 0), (1, 1), (1, -1)):
+        cells = [(r + i * dr, c + i * dc) for i in range(4)]
+        if all(0 <= rr < ROWS and 0 <= cc < COLS and board[rr][cc] == piece for rr, cc in cells):
+          return True
+  return False
+
+##################################### Bitboard #####################################
+
+def test_drop_and_undo_restore_the_position():
+  rng = random.Random(0)
+  for pos in random_positions(50, seed=3):
+    before = (pos.plus, pos.minus, list(pos.heights), pos.moves)
+    col = rng.choice(pos.legal_moves())
+    piece = pos.side_to_move
+    pos.drop(col)
+    assert pos.moves == before[3] + 1 and pos.side_to_move == -piece
+    pos.undo(col)
+    assert (pos.plus, pos.minus, pos.heights, pos.moves) == before
+
+def test_is_winning_move_matches_brute_force():
+  for pos in random_positions(200, seed=4, max_moves=40):
+    for col in pos.legal_moves():
+      for piece in (PLUS, MINUS):
+        after = pos.copy()
+        after.drop(col, piece)
+        assert pos.is_winning_move(col, piece) == has_four_scan(after.to_board(), piece)
+
+def test_board_round_trip():
+  for pos in random_positions(50, seed=5):
+    again = Position.from_board(pos.to_board())
+    assert (again.plus, again.minus, again.heights, again.moves) == (pos.plus, pos.minus, pos.heights, pos.moves)
+    assert np.array_equal(Position.from_board(pos.to_array()).to_array(), pos.to_array())
+
+def test_mirror_round_trip():
+  for pos in random_positions(50, seed=6):
+    mirrored = pos.mirror()
+    assert mirrored.to_board() == [row[::-1] for row in pos.to_board()]
+    back = mirrored.mirror()
+    assert (back.plus, back.minus, back.heights, back.moves) == (pos.plus, pos.minus, pos.heights, pos.moves)
+
+##################################### Game Logic #####################################
+
+def test_forced_move_takes_a_win():
+  board = board_from([
+    ".......",
+    ".......",
+    ".......",
+    ".......",
+    "x.x....",
+    "xooo.x.",
+  ])
+  assert forced_move(board, "minus") == (4, "win")
+
+def test_forced_move_blocks():
+  board = board_from([
+    ".......",
+    ".......",
+    ".......",
+    ".......",
+    ".......",
+    ".xxx.oo",
+  ])
+  assert forced_move(board, "minus") in ((0, "block"), (4, "block"))
+  assert forced_move(board_from(["......."] * 5 + ["...x..."]), "minus") is None
+
+def test_board_error():
+  assert board_error(board_from(["......."] * 5 + ["...x..."])) is None
+  assert "floating" in board_error(board_from(["......."] * 4 + ["...x...", "......."]))
+  assert "counts" in board_error(board_from(["......."] * 5 + ["..xx..."]))
+  assert board_error(np.zeros((5, 7))) is not None
+
+##################################### Position Cache #####################################
+
+def test_mirrored_boards_share_a_key():
+  for pos in random_positions(50, seed=7):
+    key, mirrored = canonical_key(pos.to_array(), "minus")
+    mkey, mmirrored = canonical_key(pos.mirror().to_array(), "minus")
+    assert key == mkey
+    # A symmetric board is its own mirror; otherwise exactly one side was flipped
+    assert mirrored != mmirrored or pos.to_board() == pos.mirror().to_board()
+
+def test_mirrored_cache_hit_returns_mirrored_column():
+  cache = PositionCache(name="test")
+  board = board_from(["......."] * 5 + ["x......"])
+  cache.put(board, "minus", 1)
+  assert cache.get(board, "minus") == 1
+  assert cache.get(board[:, ::-1], "minus") == COLS - 2
+  assert cache.get(board, "plus") is None
+  assert cache.stats()["mirrored_hits"] == 1
+
+##################################### Encoder #####################################
+
+def test_absolute_encoding_depends_on_side():
+  encoder = BoardEncoder(relative=False)
+  board = random_positions(1, seed=0, min_moves=4)[0].to_array()
+  plus, minus = encoder.encode_one(board, "plus"), encoder.encode_one(board, "minus")
+  assert not np.array_equal(plus, minus)
+  # Side to move shown as -1: "minus" sees the board as is, "plus" sees it negated
+  assert np.array_equal(minus[0, ..., 0], board == 1)
+  assert np.array_equal(plus[0, ..., 0], board == -1)
+
+def test_encodings_agree_up_to_channel_order():
+  board = random_positions(1, seed=1, min_moves=4)[0].to_array()
+  for side in ("plus", "minus", 1, -1):
+    relative = BoardEncoder(relative=True).encode_one(board, side)
+    absolute = BoardEncoder(relative=False).encode_one(board, side)
+    assert np.array_equal(relative, absolute[..., ::-1])
+
+def test_pooled_encoding_matches_fresh_array():
+  encoder = BoardEncoder()
+  boards = np.stack([p.to_array() for p in random_positions(5, seed=2)])
+  sides = ["plus", "minus", 1, -1, "minus"]
+  with encoder.encoding(boards, sides) as x:
+    assert np.array_equal(x, encoder.encode(boards, sides))
+
+def test_unknown_side_is_rejected():
+  board = np.zeros((6, 7), dtype=np.float32)
+  with pytest.raises(ValueError):
+    BoardEncoder().encode_one(board, "black")
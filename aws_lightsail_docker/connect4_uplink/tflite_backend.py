@@ -0,0 +1,75 @@
+import os
+import threading
+
+import numpy as np
+
+from batch_sizes import check_batch_sizes, env_batch_sizes, run_padded
+
+def _interpreter_class():
+  try:
+    # Slim interpreter-only wheels (see requirements-tflite.txt); falls back to the one bundled with TensorFlow
+    from ai_edge_litert.interpreter import Interpreter
+  except ImportError:
+    try:
+      from tflite_runtime.interpreter import Interpreter
+    except ImportError:
+      import tensorflow as tf
+      Interpreter = tf.lite.Interpreter
+  return Interpreter
+
+TFLITE_THREADS = int(os.getenv("TFLITE_THREADS", "1"))
+# Batch sizes an interpreter is allocated for; batches are zero-padded up to the next one
+TFLITE_BATCH_SIZES = env_batch_sizes("TFLITE_BATCH_SIZES")
+
+class TFLitePredictor:
+  """
+  (N,6,7,2) -> (N,7) predictor backed by a .tflite file.
+
+  The stock interpreter applies the XNNPACK delegate to float (and int8)
+  graphs by default, so no delegate library has to be loaded by hand.
+  One interpreter per size in `batch_sizes` is allocated at load, each
+  with its own lock (interpreters are not thread-safe).
+  """
+
+  def __init__(self, path, num_threads=TFLITE_THREADS, batch_sizes=TFLITE_BATCH_SIZES):
+    print(f"Loading TFLite model from {path}...")
+    self.path = path
+    self.batch_sizes = batch_sizes = check_batch_sizes(batch_sizes)
+    Interpreter = _interpreter_class()
+    self._slots = {}
+    for n in batch_sizes:
+      interpreter = Interpreter(model_path=path, num_threads=num_threads)
+      inp = interpreter.get_input_details()[0]
+      interpreter.resize_tensor_input(inp["index"], [n, 6, 7, 2])
+      interpreter.allocate_tensors()
+      self._slots[n] = (interpreter, threading.Lock())
+    interpreter = self._slots[batch_sizes[-1]][0]
+    self._input = interpreter.get_input_details()[0]
+    self._output = interpreter.get_output_details()[0]
+    print(f"✓ TFLite model loaded! (input dtype {np.dtype(self._input['dtype']).name}, "
+          f"batch sizes {', '.join(map(str, batch_sizes))})")
+
+  def _run(self, batch):
+    interpreter, lock = self._slots[len(batch)]
+    with lock:
+      interpreter.set_tensor(self._input["index"], self._quantize(batch))
+      interpreter.invoke()
+      out = interpreter.get_tensor(self._output["index"])
+    return self._dequantize(out)
+
+  def __call__(self, batch):
+    return run_padded(self._run, batch, self.batch_sizes)
+
+  # Full-integer models take/return int8 tensors; float models pass through
+  def _quantize(self, x):
+    dtype = self._input["dtype"]
+    if dtype == np.float32:
+      return x
+    scale, zero = self._input["quantization"]
+    return np.clip(np.round(x / scale + zero), np.iinfo(dtype).min, np.iinfo(dtype).max).astype(dtype)
+
+  def _dequantize(self, y):
+    if self._output["dtype"] == np.float32:
+      return y
+    scale, zero = self._output["quantization"]
+    return (y.astype(np.float32) - zero) * scale
@@ -0,0 +1,43 @@
+from game_logic import PolicyPlayer
+from startup_profile import phase
+
+# savedmodel = serving_default signature of tx_savedmodel, tflite = converted .tflite file
+PREDICT_MODES = ("savedmodel", "tflite")
+
+class TransformerPlayer(PolicyPlayer):
+    """Transformer SavedModel player"""
+
+    label = "Transformer"
+    # Trained on raw boards: +1 stones in channel 0 whichever side is to move
+    relative_encoding = False
+
+    def __init__(self, model_path, predict_mode="savedmodel"):
+        if predict_mode not in PREDICT_MODES:
+            raise ValueError(f"predict_mode must be one of {PREDICT_MODES}, got {predict_mode!r}")
+
+        self.predict_mode = predict_mode
+
+        if predict_mode == "tflite":
+            from tflite_backend import TFLitePredictor
+            self._forward = TFLitePredictor(model_path)
+        else:
+            with phase("tx.imports"):
+                import tensorflow as tf
+
+            print(f"Loading Transformer SavedModel from {model_path}...")
+            with phase("tx.model_load"):
+                self._loaded = tf.saved_model.load(model_path)
+            serving = self._loaded.signatures["serving_default"]
+
+            # determine input/output tensor names
+            input_name = list(serving.structured_input_signature[1].keys())[0]
+            output_name = list(serving.structured_outputs.keys())[0]
+
+            print("Using input:", input_name)
+            print("Using output:", output_name)
+
+            self._forward = lambda batch: serving(**{input_name: tf.constant(batch, dtype=tf.float32)})[output_name].numpy()
+
+        super().__init__()
+
+        print("✓ Transformer SavedModel loaded!")
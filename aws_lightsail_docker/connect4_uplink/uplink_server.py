@@ -1,45 +1,387 @@
-import os
-import anvil.server
-import numpy as np
+from startup_profile import PROFILER, phase
 
-from connect4 import CNNPlayer
+with phase("imports"):
+  import os
+  import threading
+  import time
+  import anvil.server
+  import numpy as np
+
+  import metrics
+  from bitboard import MINUS, PLUS, random_positions
+  from callable_registry import uplink_callable
+  from encoder import side_sign
+  from game_logic import board_error, forced_move
+  from jsonlog import LOG
+  from mcts import MCTS, MCTS_MAX_MS, MCTS_TIME_MS
+  from metrics import METRICS
+  from model_registry import ModelRegistry
+  from opening_book import OpeningTable
+  from ponder import Ponderer
+  from search import SEARCH_MAX_MS, SEARCH_TIME_MS, AlphaBetaSearch
+  from sessions import SessionStore
 
 MODEL_DIR = os.getenv("MODEL_DIR", "/models")
 CNN_PATH = os.path.join(MODEL_DIR, "CNN_v2_deep_best.h5")
+CNN_TFLITE_PATH = os.getenv("CNN_TFLITE_PATH", os.path.join(MODEL_DIR, "CNN_v2_deep_best.tflite"))
+TX_DIR = os.path.join(MODEL_DIR, "tx_savedmodel")
+TX_TFLITE_PATH = os.getenv("TX_TFLITE_PATH", os.path.join(MODEL_DIR, "tx_model.tflite"))
+# tf = Keras/TensorFlow runtime, tflite = TFLite interpreter (see convert_tflite.py)
+INFERENCE_BACKEND = os.getenv("INFERENCE_BACKEND", "tf")
+# keras = model.predict, function = traced tf.function, xla = tf.function + XLA JIT
+CNN_PREDICT_MODE = os.getenv("CNN_PREDICT_MODE", "function")
+# Models loaded and warmed up before the uplink connects
+MODELS = [m.strip() for m in os.getenv("MODELS", "cnn,tx").split(",") if m.strip()]
+WARMUP_BOARDS = int(os.getenv("WARMUP_BOARDS", "16"))
 
-cnn_player = None
+##################################### Model Registry #####################################
 
-def get_player():
-  global cnn_player
-  if cnn_player is None:
-    cnn_player = CNNPlayer(CNN_PATH)
-  return cnn_player
+def _load_cnn():
+  from connect4 import CNNPlayer
+  if INFERENCE_BACKEND == "tflite":
+    return CNNPlayer(CNN_TFLITE_PATH, predict_mode="tflite")
+  return CNNPlayer(CNN_PATH, predict_mode=CNN_PREDICT_MODE)
 
-@anvil.server.callable
-def bot_move(model_type, board, human_col=None):
-  # model_type is ignored here (CNN container only)
+def _load_tx():
+  from transformer import TransformerPlayer
+  if INFERENCE_BACKEND == "tflite":
+    return TransformerPlayer(TX_TFLITE_PATH, predict_mode="tflite")
+  return TransformerPlayer(TX_DIR)
+
+registry = ModelRegistry()
+registry.register("cnn", _load_cnn, label="CNN")
+registry.register("tx", _load_tx, label="Transformer", aliases=("transformer",))
+
+# Early plies are answered from the memory-mapped table before the model is loaded
+openings = OpeningTable.load()
+
+def get_player(name="cnn"):
+  return registry.get(name)
 
-  if human_col is not None:
-    print(f"Human played {int(human_col)}")
+##################################### Callables #####################################
 
-  player = get_player()
+def _decode_board(name, board):
+  """Request board -> float32 6x7 array; illegal boards are counted and rejected"""
   board_np = np.array(board, dtype=np.float32)
-  col = player.get_move(board_np, color="minus")
+  error = board_error(board_np)
+  if error is not None:
+    METRICS.inc("illegal_boards", name)
+    raise ValueError(f"Illegal board: {error}")
+  return board_np
+
+def _choose_move(name, board_np):
+  """(column, source) for the bot (-1): forced tactics, then opening table, then the model"""
+  # Win-in-1 / must-block-in-1 never need the network, and the opening table
+  # stores the model's raw argmax, so this check has to come first
+  forced = forced_move(board_np, "minus")
+  if forced is not None:
+    METRICS.inc(f"tactical_{forced[1]}s", name)
+    return forced
+  col = openings.lookup(board_np, name) if openings is not None else None
+  if col is not None:
+    METRICS.inc("opening_hits", name)
+    return col, "opening"
+  return registry.get(name).get_move(board_np, color="minus", tactics=False), "model"
+
+# Precomputes the bot's answers to each possible human reply between moves
+ponderer = Ponderer()
+
+def _ponder_into_cache(name, board_np, col):
+  """Stateless calls have no game identity, so pondered answers go into the model's position cache"""
+  player = registry.get(name)
+  if player.cache is None:
+    return
+
+  def store(human_cols, boards, cols):
+    for board, bot_col in zip(boards, cols):
+      if bot_col is not None:
+        player.cache.put(board, "minus", bot_col)
+
+  ponderer.submit(player, name, board_np, col, store)
+
+def _bot_move(name, board, human_col=None):
+  name = registry.resolve(name)
+  METRICS.inc("calls", name)
+  t0 = time.perf_counter()
+  try:
+    with METRICS.timer("decode", name):
+      board_np = _decode_board(name, board)
+    with ponderer.foreground():
+      col, source = _choose_move(name, board_np)
+    # After a book move the table usually answers the next bot position as well
+    if source != "opening":
+      _ponder_into_cache(name, board_np, col)
+  except Exception as e:
+    METRICS.inc("errors", name)
+    LOG.error("move_failed", model=name, human_col=human_col, error=f"{type(e).__name__}: {e}")
+    raise
+  finally:
+    elapsed = time.perf_counter() - t0
+    METRICS.observe("total", name, elapsed)
+
+  col = None if col is None else int(col)
+  # Sampled under LOG_SAMPLE_RATE
+  LOG.info("move", sample=True, model=name, human_col=None if human_col is None else int(human_col),
+           bot_col=col, source=source, ms=round(1000 * elapsed, 2))
+  return col
+
+@uplink_callable
+def bot_move(model_type, board, human_col=None):
+  return _bot_move(model_type or "cnn", board, human_col)
+
+@uplink_callable
+def bot_move_tx(board, human_col=None):
+  return _bot_move("tx", board, human_col)
+
+def _bot_move_batch(name, boards, sides=None, return_policy=False):
+  name = registry.resolve(name)
+  METRICS.inc("batch_calls", name)
+  t0 = time.perf_counter()
+  try:
+    return _bot_move_batch_inner(name, boards, sides, return_policy)
+  except Exception as e:
+    METRICS.inc("errors", name)
+    LOG.error("batch_failed", model=name, error=f"{type(e).__name__}: {e}")
+    raise
+  finally:
+    METRICS.observe("total_batch", name, time.perf_counter() - t0)
+
+def _bot_move_batch_inner(name, boards, sides, return_policy):
+  if len(boards) == 0:
+    return {"cols": [], "policies": []} if return_policy else []
+  with METRICS.timer("decode", name):
+    boards_np = np.asarray(boards, dtype=np.float32)
+    if boards_np.ndim != 3 or boards_np.shape[1:] != (6, 7):
+      raise ValueError(f"boards must be a list of 6x7 boards, got shape {boards_np.shape}")
+    for i, b in enumerate(boards_np):
+      error = board_error(b)
+      if error is not None:
+        METRICS.inc("illegal_boards", name)
+        raise ValueError(f"Illegal board at index {i}: {error}")
+  if sides is None:
+    sides = ["minus"] * len(boards_np)
+  if len(sides) != len(boards_np):
+    raise ValueError(f"got {len(sides)} sides for {len(boards_np)} boards")
+  sides = [side_sign(side) for side in sides]
+
+  player = registry.get(name)
+  if not return_policy:
+    return player.get_moves(boards_np, sides)
+  cols, scores = player.get_moves(boards_np, sides, return_policy=True)
+  return {"cols": cols, "policies": scores.astype(float).tolist()}
+
+@uplink_callable
+def bot_move_batch(model_type, boards, sides=None, return_policy=False):
+  """
+  Best column for each board in one batched forward pass. `sides` gives
+  the side to move per board ("plus"/"minus" or +1/-1, default the bot's
+  "minus"). Full boards get None. With `return_policy`, returns
+  {"cols": [...], "policies": [[7 scores], ...]}.
+  """
+  return _bot_move_batch(model_type or "cnn", boards, sides, return_policy)
 
-  if col is None:
-    print("CNN Bot played None")
-    return None
+@uplink_callable
+def bot_move_tx_batch(boards, sides=None, return_policy=False):
+  return _bot_move_batch("tx", boards, sides, return_policy)
 
-  print(f"CNN Bot played {int(col)}")
-  return int(col)
+def _bot_move_engine(name, kind, board, human_col, run):
+  """Shared plumbing for the search bots: `run(player, board_np)` returns the result dict."""
+  name = registry.resolve(name)
+  metric = f"{name}_{kind}"
+  METRICS.inc("calls", metric)
+  t0 = time.perf_counter()
+  try:
+    with METRICS.timer("decode", metric):
+      board_np = _decode_board(metric, board)
+      if int((board_np == 1).sum()) == int((board_np == -1).sum()):
+        METRICS.inc("illegal_boards", metric)
+        raise ValueError("Illegal board: it is not the bot's (-1) turn")
+    result = run(registry.get(name), board_np)
+  except Exception as e:
+    METRICS.inc("errors", metric)
+    LOG.error("move_failed", model=metric, human_col=human_col, error=f"{type(e).__name__}: {e}")
+    raise
+  finally:
+    METRICS.observe("total", metric, time.perf_counter() - t0)
+
+  stats = {k: v for k, v in result.items() if k not in ("col", "visits")}
+  LOG.info("move", sample=True, model=metric, human_col=None if human_col is None else int(human_col),
+           bot_col=result["col"], source=kind, **stats)
+  return result
+
+@uplink_callable
+def bot_move_search(board, human_col=None, time_ms=None, model_type="cnn"):
+  """
+  Alpha-beta search bot: iterative deepening within `time_ms` (default
+  SEARCH_TIME_MS, capped at SEARCH_MAX_MS), with the model's policy ordering
+  moves near the root.
+  Returns {"col", "score", "depth", "nodes", "nps", "ms", "policy_ms"}.
+  """
+  budget = min(float(time_ms or SEARCH_TIME_MS), SEARCH_MAX_MS)
+  return _bot_move_engine(model_type or "cnn", "search", board, human_col,
+                          lambda player, b: AlphaBetaSearch(player).search(b, budget))
+
+@uplink_callable
+def bot_move_mcts(board, human_col=None, time_ms=None, model_type="tx"):
+  """
+  MCTS bot with the model as policy prior, leaves evaluated MCTS_BATCH at
+  a time within `time_ms` (default MCTS_TIME_MS, capped at MCTS_MAX_MS).
+  Returns {"col", "visits", "value", "sims", "sims_per_s", "batches",
+  "avg_batch", "ms"}.
+  """
+  budget = min(float(time_ms or MCTS_TIME_MS), MCTS_MAX_MS)
+  return _bot_move_engine(model_type or "tx", "mcts", board, human_col,
+                          lambda player, b: MCTS(player).search(b, budget))
+
+##################################### Sessions #####################################
+
+# Server-side boards, so each move only carries the human's column
+sessions = SessionStore()
+
+def _game_state(session, col=None):
+  return {"col": col, "ply": session.pos.moves, "winner": session.winner, "over": session.over}
+
+def _pondered_reply(session, human_col):
+  """(column, "ponder") if the reply to this human move was precomputed, else (None, None)"""
+  pondered = session.ponder
+  session.ponder = None
+  # The human's move is already applied, so the pondered ply is one behind
+  if pondered is not None and pondered[0] == session.pos.moves - 1:
+    col = pondered[1].get(human_col)
+    if col is not None:
+      METRICS.inc("ponder_hits", session.model)
+      return col, "ponder"
+  return None, None
+
+def _ponder_session(session, board_np, bot_col):
+  ply = session.pos.moves
+  cancel = session.ponder_cancel = threading.Event()
+
+  def store(human_cols, boards, cols):
+    if not cancel.is_set():
+      session.ponder = (ply, dict(zip(human_cols, cols)))
+
+  ponderer.submit(registry.get(session.model), session.model, board_np, bot_col, store, cancel)
+
+@uplink_callable
+def start_game(model_type="cnn"):
+  """New game on an empty board (the human, +1, moves first). Returns the session id."""
+  session = sessions.create(registry.resolve(model_type or "cnn"))
+  LOG.info("game_started", session=session.id, model=session.model)
+  return session.id
+
+@uplink_callable
+def play_move(session_id, human_col, ply=None, history=None):
+  """
+  Apply the human's column to the session board and answer with the bot's.
+  `ply` (stones on the board before the human's move), if sent, is checked
+  against the server's board to catch a client that has drifted out of sync.
+  `history` (every column played before the human's move) replaces the
+  server's game first; clients send it after playing a bot move the server
+  didn't choose (a local fallback).
+  Returns {"col": bot column or None, "ply", "winner": 1/-1/None, "over"}.
+  """
+  session = sessions.get(session_id)
+  name = session.model
+  METRICS.inc("calls", name)
+  t0 = time.perf_counter()
+  try:
+    with session.lock:
+      # Whatever is still queued for the previous position is stale now
+      session.ponder_cancel.set()
+      if history is not None:
+        try:
+          session.replay([int(c) for c in history])
+        except (TypeError, ValueError):
+          METRICS.inc("illegal_moves", name)
+          raise
+        METRICS.inc("session_resyncs", name)
+      if ply is not None and int(ply) != session.pos.moves:
+        METRICS.inc("illegal_moves", name)
+        raise ValueError(f"Out of sync: server board has {session.pos.moves} stones, client sent ply {ply}")
+      try:
+        session.play(int(human_col), PLUS)
+      except (TypeError, ValueError):
+        METRICS.inc("illegal_moves", name)
+        raise
+      if session.over:
+        state = _game_state(session)
+        source = "none"
+      else:
+        col, source = _pondered_reply(session, int(human_col))
+        board_np = session.pos.to_array()
+        if col is None:
+          with ponderer.foreground():
+            col, source = _choose_move(name, board_np)
+        session.play(int(col), MINUS)
+        state = _game_state(session, int(col))
+        if not session.over and source != "opening":
+          _ponder_session(session, board_np, int(col))
+  except Exception as e:
+    METRICS.inc("errors", name)
+    LOG.error("move_failed", model=name, session=session_id, human_col=human_col,
+              error=f"{type(e).__name__}: {e}")
+    raise
+  finally:
+    elapsed = time.perf_counter() - t0
+    METRICS.observe("total", name, elapsed)
+
+  LOG.info("move", sample=True, model=name, session=session_id, human_col=int(human_col),
+           bot_col=state["col"], source=source, ms=round(1000 * elapsed, 2))
+  if state["over"]:
+    LOG.info("game_over", session=session_id, model=name, winner=state["winner"], ply=state["ply"])
+  return state
+
+@uplink_callable
+def get_game(session_id):
+  """Current board and state of a session (for a client that needs to resync)."""
+  session = sessions.get(session_id)
+  with session.lock:
+    state = _game_state(session, session.history[-1] if session.history else None)
+    state["board"] = session.to_board()
+  return state
+
+@uplink_callable
+def end_game(session_id):
+  """Drop a session early; it would expire after SESSION_TTL_SECS anyway."""
+  return sessions.end(session_id)
+
+##################################### Startup #####################################
+
+def warmup(player, n=WARMUP_BOARDS):
+  """Run representative boards through the model (single and batched) so the first caller doesn't trace the graph"""
+  boards = np.stack([pos.to_array() for pos in random_positions(n, seed=0)])
+  inputs = player.boards_to_input(boards, "minus")
+  for x in inputs:
+    player.predictor(x[None])
+  player.predict_batch(inputs)
+
+def prepare_models():
+  """Load and warm up every model in MODELS so no caller pays the cold start"""
+  for name in MODELS:
+    t0 = time.perf_counter()
+    with phase(f"{name}.load"):
+      player = registry.get(name)
+    t1 = time.perf_counter()
+    with phase(f"{name}.warmup"):
+      warmup(player)
+    t2 = time.perf_counter()
+    print(f"✓ {registry.label(name)} ready: load {1000 * (t1 - t0):.0f} ms, "
+          f"warmup {WARMUP_BOARDS} boards {1000 * (t2 - t1):.0f} ms")
 
 def main():
   key = os.getenv("ANVIL_UPLINK_KEY")
   if not key:
     raise RuntimeError("Missing ANVIL_UPLINK_KEY env var")
 
-  anvil.server.connect(key)
-  print("✅ CNN uplink connected. Waiting for calls...")
+  # Pay the cold start (imports, H5 patch, model load, tracing) before accepting calls
+  prepare_models()
+  metrics.start()
+
+  with phase("uplink_connect"):
+    anvil.server.connect(key)
+  PROFILER.report()
+  print(f"✅ Uplink connected ({', '.join(registry.label(m) for m in MODELS)}). Waiting for calls...")
   anvil.server.wait_forever()
 
 if __name__ == "__main__":